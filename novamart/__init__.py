@@ -0,0 +1 @@
+"""Data and analytics helpers behind the NovaMart Streamlit dashboard."""
@@ -0,0 +1,160 @@
+"""Query backends for the dashboard's campaign and product aggregations.
+
+``pandas`` (the default) groups tables that are already loaded in memory.
+``duckdb`` runs the same aggregations as SQL straight over the columnar
+store, or over the CSV when no fresh store exists. Only the referenced
+columns are scanned, filters are evaluated inside the scan, and only the
+grouped result comes back into pandas, so the campaign and product rows
+are never loaded whole. Select it with ``NOVAMART_BACKEND=duckdb``.
+
+Both backends return the same frame for the same call: group columns in
+their declared dtypes, sorted by the group keys, integer sums as int64 and
+everything else as float64.
+"""
+import importlib.util
+import logging
+import os
+
+import pandas as pd
+
+from novamart import schema, store, tracing
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKEND = 'pandas'
+
+# Backend -> tables it aggregates from disk (so they are not loaded into memory)
+OUT_OF_CORE = {
+    'pandas': set(),
+    'duckdb': {'campaign', 'product'},
+}
+
+AGGREGATES = ('sum', 'mean')
+
+
+def selected():
+    """Backend named by ``NOVAMART_BACKEND``, falling back to pandas if DuckDB is missing"""
+    name = os.environ.get('NOVAMART_BACKEND', DEFAULT_BACKEND).lower()
+    if name not in OUT_OF_CORE:
+        raise ValueError(f"unknown backend {name!r}; expected one of {sorted(OUT_OF_CORE)}")
+    if name == 'duckdb' and importlib.util.find_spec('duckdb') is None:
+        logger.warning("duckdb is not installed; using the pandas backend")
+        return DEFAULT_BACKEND
+    return name
+
+
+def create(name, tables):
+    """Backend instance for ``name``; ``tables`` are the in-memory datasets"""
+    if name == 'duckdb':
+        return DuckDBBackend()
+    return PandasBackend(tables)
+
+
+def _check(measures):
+    for col, how in measures.items():
+        if how not in AGGREGATES:
+            raise ValueError(f"unsupported aggregate {how!r} for {col!r}; expected one of {AGGREGATES}")
+
+
+def _finish(name, df, by, measures):
+    """Cast an aggregation result to the dtypes both backends agree on"""
+    for col in by:
+        dtype = schema.dtype_of(name, col)
+        if dtype == schema.DATE:
+            df[col] = pd.to_datetime(df[col]).astype(schema.DATE)
+        elif dtype == schema.CAT:
+            df[col] = df[col].astype(schema.CAT).cat.remove_unused_categories()
+        elif dtype is not None:
+            df[col] = df[col].astype(dtype)
+    for col, how in measures.items():
+        dtype = schema.dtype_of(name, col) or 'float32'
+        df[col] = df[col].astype('int64' if how == 'sum' and dtype.startswith('int') else 'float64')
+    return df.sort_values(by, ignore_index=True)
+
+
+class PandasBackend:
+    """Aggregations over the in-memory tables"""
+
+    name = 'pandas'
+
+    def __init__(self, tables):
+        self.tables = tables
+
+    @tracing.traced('aggregate:pandas')
+    def aggregate(self, name, by, measures, where=None):
+        """``measures`` ({column: 'sum' | 'mean'}) per ``by`` group of rows matching ``where``
+
+        ``where`` maps a column to a value, or to a list of accepted values.
+        """
+        _check(measures)
+        df = self.tables[name]
+        if where:
+            mask = pd.Series(True, index=df.index)
+            for col, value in where.items():
+                mask &= df[col].isin(value) if isinstance(value, (list, tuple, set)) else df[col] == value
+            df = df[mask]
+        derived = [col for col in measures if col not in df.columns]
+        if derived:
+            df = df.assign(**{col: schema.DERIVED[name][col](df) for col in derived})
+        # Accumulate means in float64, as the SQL side does
+        df = df.astype({col: 'float64' for col, how in measures.items() if how == 'mean'})
+        out = (df.groupby(by, observed=True)
+               .agg(**{col: (col, how) for col, how in measures.items()})
+               .reset_index())
+        return _finish(name, out, by, measures)
+
+
+class DuckDBBackend:
+    """The same aggregations as SQL over the files on disk"""
+
+    name = 'duckdb'
+
+    def __init__(self, database=':memory:'):
+        import duckdb
+
+        self._con = duckdb.connect(database)
+
+    def source(self, name):
+        """Table function scanning a dataset, preferring the columnar store"""
+        if store.store_is_fresh(name):
+            path = store.store_path(name).replace("'", "''")
+            return f"read_parquet('{path}')"
+        path = store.csv_path(name).replace("'", "''")
+        return f"read_csv('{path}', header = true)"
+
+    def _expr(self, name, col):
+        derived = schema.DERIVED.get(name, {})
+        if col in derived:
+            # Derived columns are float32 on the pandas side as well
+            return f'CAST({derived[col].sql} AS FLOAT)'
+        return f'"{col}"'
+
+    def _measure(self, name, col, how):
+        expr = self._expr(name, col)
+        if how == 'mean':
+            return f'FAVG({expr}) AS "{col}"'
+        dtype = schema.dtype_of(name, col) or 'float32'
+        if dtype.startswith('int'):
+            return f'CAST(COALESCE(SUM({expr}), 0) AS BIGINT) AS "{col}"'
+        # Compensated summation, like pandas' groupby sum
+        return f'COALESCE(FSUM({expr}), 0) AS "{col}"'
+
+    @tracing.traced('aggregate:duckdb')
+    def aggregate(self, name, by, measures, where=None):
+        """Same contract as ``PandasBackend.aggregate``"""
+        _check(measures)
+        keys = ', '.join(f'"{col}"' for col in by)
+        # pandas drops groups with a missing key
+        clauses = [f'"{col}" IS NOT NULL' for col in by]
+        params = []
+        for col, value in (where or {}).items():
+            values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            clauses.append(f'{self._expr(name, col)} IN ({", ".join("?" * len(values))})')
+            params.extend(values)
+        sql = (f'SELECT {keys}, {", ".join(self._measure(name, c, h) for c, h in measures.items())} '
+               f'FROM {self.source(name)} WHERE {" AND ".join(clauses)} '
+               f'GROUP BY {keys} ORDER BY {keys}')
+        # A cursor per query: one connection is shared by every session's thread
+        with self._con.cursor() as cursor:
+            out = cursor.execute(sql, params).df()
+        return _finish(name, out, by, measures)
@@ -0,0 +1,128 @@
+"""Headless benchmark of the dashboard's data load and sections.
+
+    python -m novamart.bench --data-dir data_100x --out bench.json
+
+No browser or server is involved. Outside ``streamlit run``, Streamlit calls
+are no-ops (bare mode), so each section's render function still does all of
+its aggregation and figure construction. Nothing is drawn.
+
+The steps measured are:
+
+* ``load``: one full ingest of the data directory;
+* each section cold: an empty figure cache, so every figure is built;
+* each section warm: the same section again, served from the figure cache.
+
+Wall times come from runs without tracing; the best of ``--repeat`` runs is
+kept for sections. Peak memory is the tracemalloc peak of one extra cold run.
+Use ``novamart.synth`` to produce larger data directories.
+"""
+import argparse
+import json
+import os
+import platform
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+
+def _peak_mb(fn):
+    """Peak traced Python allocation while ``fn`` runs, in MB"""
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1e6
+
+
+def _timed(fn):
+    began = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - began
+
+
+def run(data_dir=None, backend=None, repeat=3):
+    """Benchmark report as a JSON-serializable dict"""
+    import streamlit
+    import streamlit.logger
+
+    from novamart import ingest, sections, store
+    from novamart.figcache import FigureCache
+
+    # Bare mode warns about the missing script run context on every call
+    streamlit.logger.set_log_level('error')
+    if data_dir:
+        store.use_data_dir(data_dir)
+
+    ingestor = ingest.Ingestor(backend)
+    snapshot, load_seconds = _timed(ingestor.refresh)
+    load_peak = _peak_mb(ingest.Ingestor(backend).refresh)
+
+    start, end = snapshot.campaign_cube['date'].iloc[0], snapshot.campaign_cube['date'].iloc[-1]
+
+    def context(figures):
+        return sections.SectionContext(
+            data=snapshot.tables,
+            backend=snapshot.backend,
+            campaign_cube=snapshot.campaign_cube,
+            engine=snapshot.engine,
+            lead_scores=snapshot.lead_scores,
+            journey_paths=snapshot.journey_paths,
+            hierarchies=snapshot.hierarchies,
+            filters=sections.Filters('All', 'All', start, end),
+            figures=figures,
+            data_version=(snapshot.built_at, snapshot.version),
+        )
+
+    # Keep the one-off plotly import out of the first section's numbers
+    _, import_seconds = _timed(sections._plotly)
+
+    results = {}
+    for label in sections.SECTIONS:
+        cold, warm = [], []
+        for _ in range(repeat):
+            ctx = context(FigureCache())
+            cold.append(sections.render_section(label, ctx))
+            warm.append(sections.render_section(label, ctx))
+        results[label] = {
+            'seconds': round(min(cold), 4),
+            'warm_seconds': round(min(warm), 4),
+            'peak_mb': round(_peak_mb(lambda: sections.render_section(label, context(FigureCache()))), 2),
+        }
+
+    return {
+        'data_dir': store.DATA_DIR,
+        'backend': ingestor.backend_name,
+        'files_mb': {name: round(os.path.getsize(store.csv_path(name)) / 1e6, 2)
+                     for name in store.available()},
+        'rows': {**{name: len(df) for name, df in snapshot.tables.items()},
+                 'lead_scoring': snapshot.lead_scores.total},
+        'load': {'seconds': round(load_seconds, 4), 'peak_mb': round(load_peak, 2)},
+        'plotly_import_seconds': round(import_seconds, 4),
+        'sections': results,
+        'total_seconds': round(sum(r['seconds'] for r in results.values()), 4),
+        'environment': {
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'streamlit': streamlit.__version__,
+        },
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--data-dir', help="data directory (default: NOVAMART_DATA_DIR or data/)")
+    parser.add_argument('--backend', choices=['pandas', 'duckdb'], help="query backend (default: NOVAMART_BACKEND)")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per section (best is kept)")
+    parser.add_argument('--out', help="also write the JSON report to this file")
+    args = parser.parse_args()
+    report = run(args.data_dir, args.backend, args.repeat)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    print(text)
@@ -0,0 +1,179 @@
+"""Pre-aggregated campaign cube.
+
+The raw campaign table is rolled up once to date x region x channel x
+campaign_type with additive measures only. Sidebar filters slice this cube
+and every campaign chart is a roll-up of the slice, so rerun cost follows
+the cube's cardinality rather than the number of raw rows. Ratios (CTR,
+conversion rate, ROAS, ...) are always derived from summed numerators and
+denominators.
+"""
+import calendar
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from novamart import schema, tracing
+
+CUBE_DIMS = ['date', 'region', 'channel', 'campaign_type']
+MEASURES = ['impressions', 'clicks', 'conversions', 'spend', 'revenue']
+
+MONTH_ORDER = list(calendar.month_name)[1:]
+QUARTER_ORDER = ['Q1', 'Q2', 'Q3', 'Q4']
+
+
+def build_campaign_cube(backend):
+    """Roll raw campaign rows up to the cube grain, sorted by date
+
+    ``backend`` is a ``novamart.backends`` query backend; the raw rows never
+    need to be in memory when it reads them from disk.
+    """
+    return _with_calendar(backend.aggregate('campaign', CUBE_DIMS, dict.fromkeys(MEASURES, 'sum')))
+
+
+def _with_calendar(cube):
+    # Calendar attributes are functions of the date, so they ride along for free
+    cube['month'] = pd.Categorical(cube['date'].dt.month_name(), categories=MONTH_ORDER, ordered=True)
+    cube['quarter'] = pd.Categorical('Q' + cube['date'].dt.quarter.astype(str),
+                                     categories=QUARTER_ORDER, ordered=True)
+    return cube
+
+
+def extend_cube(cube, fresh):
+    """Cube with ``fresh`` (the cube of newly appended rows) folded in
+
+    Only cube rows from the first fresh date on are re-aggregated, so
+    appending a day costs about one day of cube rows.
+    """
+    lo, _ = date_bounds(cube, start=fresh['date'].min())
+    tail = schema.concat([cube.iloc[lo:][CUBE_DIMS + MEASURES], fresh[CUBE_DIMS + MEASURES]])
+    tail = (tail.groupby(CUBE_DIMS, observed=True)[MEASURES].sum()
+            .reset_index()
+            .sort_values(CUBE_DIMS, ignore_index=True))
+    return schema.concat([cube.iloc[:lo], _with_calendar(tail)])
+
+
+def normalize_date_range(value, min_date, max_date):
+    """Turn a ``st.date_input`` value into an inclusive (start, end) Timestamp pair
+
+    While a range is half-selected the widget returns a single date; the open
+    end then defaults to the edge of the available data.
+    """
+    if not isinstance(value, (tuple, list)):
+        value = (value,)
+    start = pd.Timestamp(value[0]) if len(value) > 0 else pd.Timestamp(min_date)
+    end = pd.Timestamp(value[1]) if len(value) > 1 else pd.Timestamp(max_date)
+    return start, end
+
+
+def date_bounds(cube, start=None, end=None):
+    """Positional [lo, hi) bounds of an inclusive date range in the date-sorted cube"""
+    dates = cube['date']
+    lo = 0 if start is None else int(dates.searchsorted(pd.Timestamp(start), side='left'))
+    hi = len(cube) if end is None else int(dates.searchsorted(pd.Timestamp(end), side='right'))
+    return lo, max(lo, hi)
+
+
+@tracing.traced('slice_cube')
+def slice_cube(cube, region='All', channel='All', start=None, end=None):
+    """Rows of the cube matching the sidebar date/region/channel selection
+
+    The date range is a binary-searched positional slice of the date-sorted
+    cube; only region/channel need a mask, and only over that slice.
+    """
+    lo, hi = date_bounds(cube, start, end)
+    if (lo, hi) != (0, len(cube)):
+        cube = cube.iloc[lo:hi]
+    mask = np.ones(len(cube), dtype=bool)
+    if region != 'All':
+        mask &= (cube['region'] == region).to_numpy()
+    if channel != 'All':
+        mask &= (cube['channel'] == channel).to_numpy()
+    if mask.all():
+        return cube
+    return cube[mask]
+
+
+def _rollup_codes(cube, dims, measures):
+    """``rollup`` over categorical dimensions as one bincount per measure
+
+    Each row's category codes are combined into a single cell index; cells
+    come out in code order, which is the order ``groupby`` sorts them in.
+    Returns None when the combined cell space is too sparse to be worth it.
+    """
+    columns = [cube[dim] for dim in dims]
+    shape = tuple(len(col.cat.categories) for col in columns)
+    size = int(np.prod(shape))
+    if size > max(4 * len(cube), 1 << 16):
+        return None
+    codes = [col.cat.codes.to_numpy() for col in columns]
+    valid = np.logical_and.reduce([c >= 0 for c in codes])
+    flat = np.ravel_multi_index([c[valid] for c in codes], shape)
+    cells = np.flatnonzero(np.bincount(flat, minlength=size))
+    out = {dim: pd.Categorical.from_codes(idx, dtype=col.dtype)
+           for dim, col, idx in zip(dims, columns, np.unravel_index(cells, shape))}
+    for m in measures:
+        values = cube[m].to_numpy()[valid]
+        sums = np.bincount(flat, weights=values, minlength=size)[cells]
+        out[m] = np.rint(sums).astype(np.int64) if values.dtype.kind in 'iu' else sums
+    return pd.DataFrame(out)
+
+
+@tracing.traced('rollup')
+def rollup(cube, by, measures=None):
+    """Sum cube measures up to the given dimensions"""
+    measures = measures or MEASURES
+    dims = [by] if isinstance(by, str) else list(by)
+    if all(isinstance(cube[dim].dtype, pd.CategoricalDtype) for dim in dims):
+        out = _rollup_codes(cube, dims, measures)
+        if out is not None:
+            return out
+    return cube.groupby(by, observed=True)[measures].sum().reset_index()
+
+
+class GroupingPlan:
+    """Several rollups of one cube slice computed from a single grouping pass
+
+    The slice is grouped once, lazily, to the finest grain any of the
+    ``groupings`` needs; every rollup is then a re-aggregation of that small
+    intermediate. Only additive measures are kept, so ratios stay exact when
+    derived afterwards with ``add_ratios``.
+    """
+
+    def __init__(self, cube, groupings, measures=None):
+        self.cube = cube
+        self.measures = measures or MEASURES
+        self.grain = []
+        for by in groupings:
+            for dim in ([by] if isinstance(by, str) else by):
+                if dim not in self.grain:
+                    self.grain.append(dim)
+
+    @cached_property
+    def base(self):
+        """The slice summed to the plan's grain"""
+        return rollup(self.cube, self.grain, self.measures)
+
+    def rollup(self, by, measures=None):
+        """Same result as ``rollup(cube, by, measures)``, from the planned intermediate"""
+        dims = [by] if isinstance(by, str) else list(by)
+        missing = [dim for dim in dims if dim not in self.grain]
+        if missing:
+            raise ValueError(f"{missing} are not in the planned grain {self.grain}")
+        return rollup(self.base, by, measures or self.measures)
+
+
+def add_ratios(df):
+    """Derive rate metrics (in %) and ROAS from summed measures"""
+    df = df.copy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        df['ctr'] = df['clicks'] / df['impressions'] * 100
+        df['conversion_rate'] = df['conversions'] / df['clicks'] * 100
+        df['roas'] = df['revenue'] / df['spend']
+        df['cpa'] = df['spend'] / df['conversions']
+    return df
+
+
+def totals(cube):
+    """Grand totals of every measure plus derived ratios, as a Series"""
+    return add_ratios(cube[MEASURES].sum().to_frame().T).iloc[0]
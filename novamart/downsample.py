@@ -0,0 +1,103 @@
+"""Server-side downsampling for time-series charts.
+
+Plotly ships every point to the browser, so long daily (or hourly) series
+are reduced before plotting. Largest-Triangle-Three-Buckets keeps the
+visual shape of a line including its peaks; min/max bucketing is a cheaper
+alternative that keeps both extremes of every bucket.
+"""
+import numpy as np
+
+from novamart import tracing
+
+# Typical rendered width of a full-width dashboard chart in CSS pixels
+FULL_WIDTH_PX = 1200
+
+# Points per horizontal pixel worth sending; more is invisible
+POINTS_PER_PX = 1
+
+
+def max_points(width=1.0, points_per_px=POINTS_PER_PX):
+    """Point budget per trace for a chart spanning ``width`` of the page
+
+    ``width`` is the chart's share of the full width: 1 for a full-width
+    chart, 0.5 for one of two ``st.columns``.
+    """
+    return max(int(FULL_WIDTH_PX * width * points_per_px), 3)
+
+
+def _as_float(values):
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype('datetime64[ns]').astype(np.int64).astype(float)
+    return values.astype(float)
+
+
+def lttb_indices(x, y, n_out):
+    """Indices of the points kept by Largest-Triangle-Three-Buckets"""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x, y = _as_float(x), _as_float(y)
+
+    # First and last points are always kept; the rest split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    prev = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # The next bucket's mean is the third vertex of the triangle
+        nlo, nhi = hi, (edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[prev] - avg_x) * (y[lo:hi] - y[prev])
+                      - (x[prev] - x[lo:hi]) * (avg_y - y[prev]))
+        prev = lo + int(np.argmax(area))
+        kept[i + 1] = prev
+    return kept
+
+
+def minmax_indices(y, n_out):
+    """Indices of the minimum and maximum of each of n_out // 2 equal buckets"""
+    n = len(y)
+    if n_out >= n or n_out < 2:
+        return np.arange(n)
+    y = _as_float(y)
+    n_buckets = n_out // 2
+    edges = np.linspace(0, n, n_buckets + 1).astype(int)
+    starts = edges[:-1]
+    lows = np.minimum.reduceat(y, starts)
+    highs = np.maximum.reduceat(y, starts)
+    bucket = np.repeat(np.arange(n_buckets), np.diff(edges))
+    # First position in each bucket holding its min / max
+    is_low = y == lows[bucket]
+    is_high = y == highs[bucket]
+    first_low = np.minimum.reduceat(np.where(is_low, np.arange(n), n), starts)
+    first_high = np.minimum.reduceat(np.where(is_high, np.arange(n), n), starts)
+    return np.unique(np.concatenate([first_low, first_high]))
+
+
+@tracing.traced('downsample')
+def downsample(df, x, y, n_out, by=None, method='lttb'):
+    """Reduce a long-format time series frame to at most n_out points per trace
+
+    With ``by`` (e.g. one trace per channel of a stacked area chart) the kept
+    x positions are chosen once from the summed series and shared by every
+    trace, so stacks stay aligned.
+    """
+    if by is None:
+        series = df.sort_values(x)
+    else:
+        series = df.groupby(x, sort=True)[y].sum().reset_index()
+    if len(series) <= n_out:
+        return df
+
+    if method == 'lttb':
+        kept = lttb_indices(series[x].to_numpy(), series[y].to_numpy(), n_out)
+    elif method == 'minmax':
+        kept = minmax_indices(series[y].to_numpy(), n_out)
+    else:
+        raise ValueError(f"Unknown downsampling method: {method}")
+
+    if by is None:
+        return series.iloc[kept]
+    return df[df[x].isin(series[x].iloc[kept])]
@@ -0,0 +1,105 @@
+"""Process-wide cache of serialized Plotly figures.
+
+Figures are keyed by section/chart id plus the normalized state they depend
+on (sidebar filters, widget values), so sessions looking at the same view
+share one build. Entries hold the figure's JSON spec; the cache enforces a
+byte budget with least-recently-used eviction and drops everything when
+a newer data version arrives. Versions must be ordered (newer compares
+greater); runs still rendering an older version get their figures built
+but not cached.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_BYTES = int(float(os.environ.get('NOVAMART_FIGURE_CACHE_MB', 64)) * 1e6)
+
+
+def _normalize(value):
+    """Hashable, representation-independent form of one piece of key state"""
+    if isinstance(value, (pd.Timestamp, datetime, date)):
+        return pd.Timestamp(value).isoformat()
+    if isinstance(value, (float, np.floating)):
+        return round(float(value), 6)
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, (tuple, list)):
+        return tuple(_normalize(v) for v in value)
+    return value
+
+
+class FigureCache:
+    """Byte-bounded LRU of figure JSON specs with hit/miss counters"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def key(self, section, chart, *state):
+        return (section, chart) + tuple(_normalize(v) for v in state)
+
+    def _check_version(self, version):
+        """False for an older version, which must not displace the current one"""
+        if self.version is not None and version < self.version:
+            return False
+        if version != self.version:
+            self._entries.clear()
+            self._bytes = 0
+            self.version = version
+        return True
+
+    def get_or_build(self, key, version, build, info=None):
+        """Figure spec (a plain dict) for ``key``; ``build`` returns a go.Figure on a miss
+
+        When given, ``info`` is filled with ``hit`` and the spec's size in ``bytes``.
+        """
+        with self._lock:
+            current = self._check_version(version)
+            spec = self._entries.get(key) if current else None
+            if spec is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                if info is not None:
+                    info.update(hit=True, bytes=len(spec))
+                return json.loads(spec)
+            self.misses += 1
+
+        # Build outside the lock so slow figures do not serialize other sessions
+        spec = build().to_json()
+        size = len(spec)
+        if info is not None:
+            info.update(hit=False, bytes=size)
+        with self._lock:
+            if version == self.version and size <= self.max_bytes and key not in self._entries:
+                self._entries[key] = spec
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._bytes -= len(evicted)
+                    self.evictions += 1
+        return json.loads(spec)
+
+    def stats(self):
+        """Counters for sizing the cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
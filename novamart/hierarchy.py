@@ -0,0 +1,156 @@
+"""Hierarchical rollups with exact totals and the top-K children of every node.
+
+``HierarchyIndex`` is built once per data snapshot from leaf rows (one
+column per level plus a value) and keeps, for each level:
+
+* the total of every node whose ancestors all made their parent's top K,
+  ranked within its parent (largest first);
+* per parent, the total and number of the children that did not make the
+  top K. These are drawn as one "Other" node, so every parent still
+  equals the sum of what is drawn under it.
+
+Each level is one ``np.unique`` over integer-coded keys and a ``bincount``.
+The top K of a large sibling group is chosen with ``argpartition``, so only
+the kept children are ever sorted. Pruned branches are dropped entirely, and
+``nodes`` then walks at most K children per parent. Drawing a treemap or
+sunburst therefore costs O(K^depth) however many leaves the data has.
+"""
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_TOP_K = 10
+
+OTHER = 'Other'
+
+
+class Level(NamedTuple):
+    """Kept nodes at one depth, grouped by parent, largest first within a parent"""
+    code: np.ndarray
+    parent: np.ndarray  # index into the previous level's kept nodes (0 = root at depth 0)
+    total: np.ndarray
+    rank: np.ndarray  # position among its siblings
+    other_total: np.ndarray  # per parent: total of the children beyond the top K
+    other_count: np.ndarray  # per parent: how many such children
+
+
+def _codes(values):
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy().astype(np.int64), values.cat.categories
+    codes, labels = pd.factorize(values, sort=True)
+    return codes.astype(np.int64), labels
+
+
+def _top_k(total, parent, n_parents, k):
+    """Indices of the ``k`` largest nodes under each parent, ordered (parent, total desc)"""
+    sizes = np.bincount(parent, minlength=n_parents)
+    starts = np.r_[0, np.cumsum(sizes)[:-1]]
+    keep = np.ones(len(total), dtype=bool)
+    for p in np.flatnonzero(sizes > k):
+        group = slice(starts[p], starts[p] + sizes[p])
+        drop = np.argpartition(-total[group], k - 1)[k:]
+        keep[starts[p] + drop] = False
+    kept = np.flatnonzero(keep)
+    return kept[np.lexsort((-total[kept], parent[kept]))]
+
+
+class HierarchyIndex:
+    """Per-level totals of a hierarchy, pruned to the top K children of each node"""
+
+    def __init__(self, df, levels, value=None, top_k=DEFAULT_TOP_K):
+        """``df``: leaf rows with a column per level; ``value`` is summed (None counts rows)"""
+        self.names = list(levels)
+        self.top_k = top_k
+        weights = (df[value].to_numpy(dtype=np.float64) if value is not None
+                   else np.ones(len(df)))
+        self.total = float(weights.sum())
+        codes, self.labels = [], []
+        for name in self.names:
+            c, labels = _codes(df[name])
+            codes.append(c)
+            self.labels.append(np.asarray(labels, dtype=object))
+        # Rows with a missing level value cannot be placed
+        rows = np.flatnonzero(np.logical_and.reduce([c >= 0 for c in codes])) if codes else np.arange(0)
+        self.levels = []
+        node = np.zeros(len(rows), dtype=np.int64)  # kept parent of each row
+        n_parents = 1
+        for d, c in enumerate(codes):
+            width = len(self.labels[d])
+            keys, inverse = np.unique(node * width + c[rows], return_inverse=True)
+            total = np.bincount(inverse, weights=weights[rows], minlength=len(keys))
+            parent, code = keys // width, keys % width
+            kept = _top_k(total, parent, n_parents, top_k)
+            parent_total = np.bincount(parent, weights=total, minlength=n_parents)
+            kept_total = np.bincount(parent[kept], weights=total[kept], minlength=n_parents)
+            sizes = np.bincount(parent, minlength=n_parents)
+            kept_sizes = np.bincount(parent[kept], minlength=n_parents)
+            rank = np.arange(len(kept)) - np.r_[0, np.cumsum(kept_sizes)[:-1]][parent[kept]]
+            self.levels.append(Level(code[kept], parent[kept], total[kept], rank,
+                                     np.maximum(parent_total - kept_total, 0), sizes - kept_sizes))
+            # Follow only the rows under kept nodes to the next level
+            renumber = np.full(len(keys), -1, dtype=np.int64)
+            renumber[kept] = np.arange(len(kept))
+            row_node = renumber[inverse]
+            under_kept = row_node >= 0
+            rows, node = rows[under_kept], row_node[under_kept]
+            n_parents = len(kept)
+
+    @classmethod
+    def from_backend(cls, backend, table, levels, value, top_k=DEFAULT_TOP_K):
+        """Index over a backend's leaf-level sums of ``value``"""
+        leaves = backend.aggregate(table, list(levels), {value: 'sum'})
+        return cls(leaves, levels, value, top_k)
+
+    def nodes(self, k=None, depth=None):
+        """Drawable nodes, top ``k`` (<= top_k) children per parent plus "Other"
+
+        Returns columns id, parent ('' at the top), label, value, depth, in
+        the form ``go.Treemap`` / ``go.Sunburst`` take with
+        ``branchvalues='total'``. The value of a drawn parent is the sum of
+        what is drawn under it, which equals its exact total.
+        """
+        k = self.top_k if k is None else min(k, self.top_k)
+        depth = len(self.levels) if depth is None else min(depth, len(self.levels))
+        parts = []
+        shown = np.ones(1, dtype=bool)  # the root
+        ids = np.array([''], dtype=object)
+        for d in range(depth):
+            level = self.levels[d]
+            n_parents = len(shown)
+            keep = (level.rank < k) & shown[level.parent]
+            # Children past the top k join the precomputed remainder
+            folded = (level.rank >= k)
+            other_total = level.other_total + np.bincount(level.parent[folded], weights=level.total[folded],
+                                                          minlength=n_parents)
+            other_count = level.other_count + np.bincount(level.parent[folded], minlength=n_parents)
+            node_ids = np.array([f'{d}/{i}' for i in range(len(level.code))], dtype=object)
+            node_ids[~keep] = None
+            parts.append(pd.DataFrame({
+                'id': node_ids[keep],
+                'parent': ids[level.parent[keep]],
+                'label': self.labels[d][level.code[keep]],
+                'value': level.total[keep],
+                'depth': d,
+            }))
+            others = np.flatnonzero(shown & (other_count > 0))
+            parts.append(pd.DataFrame({
+                'id': [f'{d}/other/{p}' for p in others],
+                'parent': ids[others],
+                'label': [f'{OTHER} ({n:,})' for n in other_count[others]],
+                'value': other_total[others],
+                'depth': d,
+            }))
+            shown, ids = keep, node_ids
+        frame = pd.concat(parts, ignore_index=True)
+        return _sum_up(frame)
+
+
+def _sum_up(frame):
+    """Set each parent's value to the sum of its drawn children (deepest first)"""
+    value = frame.set_index('id')['value'].copy()
+    for d in sorted(frame['depth'].unique(), reverse=True)[:-1]:
+        children = frame[frame['depth'] == d]
+        sums = value[children['id'].to_numpy()].groupby(children['parent'].to_numpy()).sum()
+        value[sums.index] = sums.to_numpy()
+    return frame.assign(value=value[frame['id'].to_numpy()].to_numpy())
@@ -0,0 +1,331 @@
+"""Append-aware ingestion of the data files.
+
+``Ingestor`` holds the in-memory tables and the campaign aggregates (cube and
+time-series engine) built from the current files, as an immutable
+``Snapshot``. ``refresh`` stats every file and only looks further at files
+whose size or mtime moved:
+
+* a file that grew, with the bytes seen last time still in place, has only
+  the appended rows parsed (up to its last complete line, so a row still
+  being written waits for the next poll); they are concatenated onto its
+  table and, for the campaign file, rolled into the cube and engine;
+* anything else is reloaded whole.
+
+When the optional touchpoint event log changes in any way, the attribution
+table and the journey path index are recomputed from the whole log, since a
+journey can span an append. The optional web event log feeds a streaming
+funnel counter instead: appended events are folded into it, and only a
+rewrite streams the whole file again.
+
+"Still in place" is checked by hashing a window at the start of the file and
+the window just before the old end, so the check costs two small reads. No
+file is ever hashed whole: loading one only records its size, mtime and
+those windows, and telling a touched-but-identical file from a rewrite
+would cost as much as reloading it.
+
+``start`` runs ``refresh`` in a daemon thread that polls the files, so the
+work happens off the request path. Each refresh publishes a new snapshot by
+swapping one reference; a script run reads ``snapshot`` once and keeps
+using that version even if a newer one is published meanwhile. File states
+and the funnel counter are only recorded once that snapshot is published,
+so a refresh that fails part-way is redone in full on the next poll.
+"""
+import hashlib
+import io
+import logging
+import os
+import threading
+import time
+from types import MappingProxyType
+from typing import NamedTuple
+
+import pandas as pd
+
+from novamart import attribution, backends, cube, schema, store
+from novamart.funnel import FunnelCounter
+from novamart.hierarchy import HierarchyIndex
+from novamart.paths import PathIndex
+from novamart.scoring import ScoreHistogram
+from novamart.timeseries import TimeSeriesEngine
+
+logger = logging.getLogger(__name__)
+
+# Bytes hashed at the head of a file and before its previous end
+WINDOW_BYTES = 64 * 1024
+
+# Seconds between background checks of the data files
+REFRESH_SECONDS = float(os.environ.get('NOVAMART_REFRESH_SECONDS', 10))
+
+# Hierarchy -> (dataset, levels, summed value or None to count rows), indexed per snapshot
+HIERARCHIES = {
+    'product': ('product', ['category', 'subcategory', 'product_name'], 'sales'),
+    'customer': ('customer', ['region', 'city_tier', 'customer_segment'], None),
+}
+
+
+class FileState(NamedTuple):
+    """What was last ingested from one file"""
+    size: int
+    mtime_ns: int
+    head: str  # hash of the first WINDOW_BYTES
+    tail: str  # hash of the last WINDOW_BYTES
+
+
+class Snapshot(NamedTuple):
+    """One consistent version of the data; never mutated once published"""
+    version: str
+    tables: store.SharedTables
+    backend: object
+    campaign_cube: pd.DataFrame
+    engine: TimeSeriesEngine
+    lead_scores: ScoreHistogram
+    journey_paths: PathIndex
+    hierarchies: MappingProxyType  # name in HIERARCHIES -> HierarchyIndex
+    changes: dict  # dataset -> 'loaded' | 'appended: N rows' from the refresh that built it
+    seconds: float  # time the refresh that built it took
+    built_at: float  # wall-clock time it was published
+
+
+def _digest(f, start, end):
+    f.seek(start)
+    return hashlib.sha1(f.read(end - start)).hexdigest()
+
+
+def _windows(f, size):
+    """(head, tail) window hashes of a file that is ``size`` bytes long"""
+    return (_digest(f, 0, min(size, WINDOW_BYTES)),
+            _digest(f, max(0, size - WINDOW_BYTES), size))
+
+
+def scan(path):
+    """FileState of a file (two window reads, not a pass over the file)"""
+    st = os.stat(path)
+    with open(path, 'rb') as f:
+        head, tail = _windows(f, st.st_size)
+    return FileState(st.st_size, st.st_mtime_ns, head, tail)
+
+
+def read_appended(name, path, old, columns=None):
+    """(new FileState, parsed rows) when ``path`` only grew since ``old``, else None
+
+    Only whole lines are read: a row still being written is left for the
+    next call, and the state stops at the end of the last complete line.
+    Rows are None while no appended line is complete yet.
+    """
+    st = os.stat(path)
+    if st.st_size <= old.size:
+        return None
+    with open(path, 'rb') as f:
+        if _windows(f, old.size) != (old.head, old.tail):
+            return None
+        f.seek(old.size - 1)
+        if f.read(1) != b'\n':
+            # The last line seen was incomplete, so the new bytes do not start a row
+            return None
+        appended = f.read(st.st_size - old.size)
+        appended = appended[:appended.rfind(b'\n') + 1]
+        if not appended:
+            return old, None
+        size = old.size + len(appended)
+        f.seek(0)
+        header = f.readline()
+        head, tail = _windows(f, size)
+    rows = pd.read_csv(io.BytesIO(header + appended), usecols=schema.physical_columns(name, columns))
+    rows = schema.project(name, schema.apply(name, rows), columns)
+    return FileState(size, st.st_mtime_ns, head, tail), rows
+
+
+class Ingestor:
+    """Keeps a snapshot of the data files current at the cost of what changed"""
+
+    def __init__(self, backend=None):
+        self.backend_name = backend or backends.selected()
+        self.out_of_core = backends.OUT_OF_CORE[self.backend_name]
+        self.snapshot = None
+        self.checked_at = None
+        self.last_error = None
+        self._states = {}
+        self._shared_backend = None
+        self._funnel = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _changed(self):
+        """Datasets whose file size or mtime moved (or that went away) since the last ingest"""
+        changed = []
+        for name in store.DATASETS:
+            old = self._states.get(name)
+            try:
+                st = os.stat(store.csv_path(name))
+            except FileNotFoundError:
+                if name not in store.OPTIONAL:
+                    raise
+                if old is not None:
+                    changed.append(name)
+                continue
+            if old is None or (st.st_size, st.st_mtime_ns) != (old.size, old.mtime_ns):
+                changed.append(name)
+        return changed
+
+    def _backend(self, tables):
+        if self.backend_name == 'pandas':
+            return backends.PandasBackend(tables)
+        if self._shared_backend is None:
+            self._shared_backend = backends.create(self.backend_name, tables)
+        return self._shared_backend
+
+    def _update_funnel(self, changes, fresh):
+        """Funnel counter with appended web events folded in, or rebuilt from the file
+
+        The current counter is left as it is; ``refresh`` swaps in the new one
+        once its snapshot is published.
+        """
+        if self._funnel is not None and fresh is not None:
+            try:
+                return self._funnel.copy().add(fresh)
+            except ValueError:
+                # Appended events older than those already counted
+                logger.warning("web events appended out of time order; recounting the funnel")
+        elif self._funnel is not None and 'web_events' not in changes:
+            return self._funnel
+        return FunnelCounter.from_chunks(
+            store.iter_chunks('web_events', store.PROJECTIONS['web_events']))
+
+    def current(self):
+        """The latest published snapshot, loading the first one if there is none yet"""
+        snapshot = self.snapshot
+        return snapshot if snapshot is not None else self.refresh()
+
+    def start(self, interval=REFRESH_SECONDS):
+        """Refresh in a daemon thread every ``interval`` seconds"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._watch, args=(interval,),
+                                                name='novamart-refresh', daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _watch(self, interval):
+        while True:
+            try:
+                self.refresh()
+                self.last_error = None
+            except Exception as e:
+                # Keep serving the previous snapshot
+                logger.exception("data refresh failed")
+                self.last_error = str(e)
+            if self._stop.wait(interval):
+                return
+
+    def refresh(self):
+        """The current snapshot, first folding in any change to the files"""
+        with self._lock:
+            changed = self._changed()
+            self.checked_at = time.time()
+            if self.snapshot is not None and not changed:
+                return self.snapshot
+            began = time.perf_counter()
+            previous = self.snapshot
+            # File states are recorded only once the snapshot built from them
+            # is published, so a refresh that fails part-way is redone in full
+            states = dict(self._states)
+            tables = dict(previous.tables) if previous else {}
+            changes = {}
+            fresh_campaign = fresh_leads = fresh_web_events = None
+            for name in changed:
+                path = store.csv_path(name)
+                old = states.get(name)
+                if not os.path.exists(path):
+                    # An optional file was removed
+                    del states[name]
+                    changes[name] = 'removed'
+                    continue
+                columns = store.PROJECTIONS.get(name)
+                # Attribution re-reads the whole event log anyway, so its appended rows are not parsed
+                grown = (read_appended(name, path, old, columns)
+                         if old is not None and name != 'events' else None)
+                if grown is not None:
+                    states[name], rows = grown
+                    if rows is None:
+                        # Only part of a row so far: it is read once its line is complete
+                        continue
+                    changes[name] = f'appended: {len(rows):,} rows'
+                    if name in tables:
+                        tables[name] = schema.concat([tables[name], rows])
+                    if name == 'campaign':
+                        fresh_campaign = rows
+                    elif name == 'lead_scoring':
+                        fresh_leads = rows
+                    elif name == 'web_events':
+                        fresh_web_events = rows
+                    continue
+                states[name] = scan(path)
+                changes[name] = 'loaded'
+                if name not in store.STREAMED and name not in self.out_of_core:
+                    tables[name] = store.load_table(name, columns)
+
+            if previous is not None and not changes:
+                return previous
+
+            journey_paths = previous.journey_paths if previous else None
+            if 'events' in states:
+                if changes.keys() & {'events', 'attribution', 'journey'}:
+                    events = store.load_table('events', store.PROJECTIONS['events'])
+                    tables['attribution'] = attribution.attribute(events)
+                    journey_paths = PathIndex.from_events(events)
+            else:
+                if changes.get('events') == 'removed':
+                    tables['attribution'] = store.load_table('attribution')
+                if journey_paths is None or changes.keys() & {'events', 'journey'}:
+                    journey_paths = PathIndex.from_table(tables['journey'])
+
+            funnel = self._funnel
+            if 'web_events' in states:
+                funnel = self._update_funnel(changes, fresh_web_events)
+                if changes.keys() & {'web_events', 'funnel'}:
+                    tables['funnel'] = funnel.table()
+            elif changes.get('web_events') == 'removed':
+                funnel = None
+                tables['funnel'] = store.load_table('funnel')
+
+            shared = store.share_tables(tables)
+            backend = self._backend(shared)
+            if previous is None or changes.get('campaign') == 'loaded':
+                campaign_cube = cube.build_campaign_cube(backend)
+                engine = TimeSeriesEngine(campaign_cube)
+            elif fresh_campaign is not None and len(fresh_campaign):
+                fresh = cube.build_campaign_cube(backends.PandasBackend({'campaign': fresh_campaign}))
+                campaign_cube = cube.extend_cube(previous.campaign_cube, fresh)
+                engine = previous.engine.extended(fresh)
+            else:
+                campaign_cube, engine = previous.campaign_cube, previous.engine
+
+            if previous is None or changes.get('lead_scoring') == 'loaded':
+                lead_scores = ScoreHistogram.from_chunks(
+                    store.iter_chunks('lead_scoring', store.PROJECTIONS['lead_scoring']))
+            elif fresh_leads is not None:
+                lead_scores = previous.lead_scores.copy().add(
+                    fresh_leads['predicted_probability'], fresh_leads['actual_converted'])
+            else:
+                lead_scores = previous.lead_scores
+
+            hierarchies = dict(previous.hierarchies) if previous else {}
+            for key, (name, levels, value) in HIERARCHIES.items():
+                if key in hierarchies and name not in changes:
+                    continue
+                if value is None:
+                    hierarchies[key] = HierarchyIndex(tables[name], levels)
+                else:
+                    hierarchies[key] = HierarchyIndex.from_backend(backend, name, levels, value)
+
+            version = hashlib.sha1(repr([states[name] for name in store.DATASETS
+                                         if name in states]).encode()).hexdigest()[:12]
+            self.snapshot = Snapshot(version, shared, backend, campaign_cube, engine, lead_scores,
+                                     journey_paths, MappingProxyType(hierarchies), changes, time.perf_counter() - began, time.time())
+            self._states, self._funnel = states, funnel
+            return self.snapshot
+
@@ -0,0 +1,215 @@
+"""Concurrent-session load test of dashboard rerun latency.
+
+    python -m novamart.loadtest --sessions 1 4 16 --reruns 20 --out load.json
+
+For each concurrency level N, opens N sessions of ``app.py`` with
+Streamlit's ``AppTest``, one thread each. Each session first runs the script
+once; that run is reported separately as ``first_run``. It then changes the
+sidebar region, channel or date range to random values and reruns, once per
+step. As on a server, every session's script runs in its own thread of
+one process, sharing the cached data, figure cache and GIL. What is
+measured is therefore the dashboard's own rerun cost under contention. The
+browser, websocket and protobuf serialization are left out.
+
+Each level reports:
+
+* p50/p95/p99/max rerun latency;
+* throughput (reruns per second of wall time);
+* failed reruns (script exceptions);
+* process RSS, sampled during the level.
+
+The JSON report records the git commit and library versions. Pass
+``--compare`` with an earlier report to print the change per level.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+from novamart import memory
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+
+# Seconds between RSS samples while a level runs
+RSS_INTERVAL = 0.1
+
+
+def _sidebar(at, kind, label):
+    return next(w for w in getattr(at.sidebar, kind) if w.label == label)
+
+
+def _random_step(at, rng, full_range):
+    """Set one sidebar filter to a random value; returns which"""
+    action = rng.choice(['region', 'channel', 'date_range'])
+    if action == 'date_range':
+        start, end = full_range
+        days = (end - start).days
+        a, b = sorted(rng.sample(range(days + 1), 2)) if days else (0, 0)
+        _sidebar(at, 'date_input', 'Select Date Range').set_value(
+            (start + datetime.timedelta(days=a), start + datetime.timedelta(days=b)))
+    else:
+        box = _sidebar(at, 'selectbox', 'Select Region' if action == 'region' else 'Select Channel')
+        box.set_value(rng.choice(box.options))
+    return action
+
+
+def _session(seed, reruns, think, timeout, results):
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed)
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    began = time.perf_counter()
+    at.run()
+    results['first_run'].append(time.perf_counter() - began)
+    results['errors'].append(len(at.exception))
+    full_range = _sidebar(at, 'date_input', 'Select Date Range').value
+    for _ in range(reruns):
+        if think:
+            time.sleep(rng.uniform(0, think))
+        _random_step(at, rng, full_range)
+        began = time.perf_counter()
+        at.run()
+        results['latency'].append(time.perf_counter() - began)
+        results['errors'].append(len(at.exception))
+
+
+def _sample_rss(stop, samples):
+    while not stop.wait(RSS_INTERVAL):
+        samples.append(memory.process_rss())
+
+
+def _ms(values, q):
+    return round(float(np.percentile(values, q)) * 1e3, 1) if len(values) else None
+
+
+def run_level(sessions, reruns, seed=0, think=0.0, timeout=120):
+    """Latency / throughput / RSS of ``sessions`` concurrent sessions"""
+    # Lists, since append is atomic across the session threads
+    results = {'first_run': [], 'latency': [], 'errors': []}
+    rss = [memory.process_rss()]
+    stop = threading.Event()
+    sampler = threading.Thread(target=_sample_rss, args=(stop, rss), daemon=True)
+    threads = [threading.Thread(target=_session, args=(seed * 1000 + i, reruns, think, timeout, results),
+                                name=f'loadtest-{i}')
+               for i in range(sessions)]
+    sampler.start()
+    began = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - began
+    stop.set()
+    sampler.join()
+    rss.append(memory.process_rss())
+
+    latency = results['latency']
+    return {
+        'sessions': sessions,
+        'reruns': len(latency),
+        'errors': sum(results['errors']),
+        'p50_ms': _ms(latency, 50),
+        'p95_ms': _ms(latency, 95),
+        'p99_ms': _ms(latency, 99),
+        'max_ms': _ms(latency, 100),
+        'first_run_p50_ms': _ms(results['first_run'], 50),
+        'throughput_rps': round(len(latency) / wall, 2) if wall else None,
+        'wall_seconds': round(wall, 2),
+        'rss_mb_peak': round(max(rss) / 1e6, 1),
+        'rss_mb_end': round(rss[-1] / 1e6, 1),
+    }
+
+
+def _commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(APP),
+                             capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def run(levels, reruns=20, seed=0, think=0.0, data_dir=None, backend=None):
+    """Load test report as a JSON-serializable dict"""
+    import pandas as pd
+    import streamlit
+    import streamlit.logger
+
+    streamlit.logger.set_log_level('error')
+    # The app reads these when it first loads its data in this process
+    if data_dir:
+        os.environ['NOVAMART_DATA_DIR'] = os.path.abspath(data_dir)
+    if backend:
+        os.environ['NOVAMART_BACKEND'] = backend
+
+    report_levels = []
+    for sessions in levels:
+        report_levels.append(run_level(sessions, reruns, seed, think))
+    return {
+        'app': APP,
+        'commit': _commit(),
+        'data_dir': os.environ.get('NOVAMART_DATA_DIR'),
+        'backend': os.environ.get('NOVAMART_BACKEND'),
+        'reruns_per_session': reruns,
+        'think_seconds': think,
+        'levels': report_levels,
+        'environment': {
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'streamlit': streamlit.__version__,
+            'cpus': os.cpu_count(),
+        },
+    }
+
+
+def compare(report, baseline):
+    """Lines of p95 / throughput / peak RSS change against a baseline report, per level"""
+    old = {level['sessions']: level for level in baseline['levels']}
+    lines = [f"vs {baseline.get('commit') or 'baseline'}:"]
+    for level in report['levels']:
+        before = old.get(level['sessions'])
+        if before is None:
+            continue
+        parts = []
+        for key, unit in (('p95_ms', 'ms'), ('throughput_rps', '/s'), ('rss_mb_peak', 'MB')):
+            if level[key] is None or before[key] is None:
+                continue
+            change = (level[key] / before[key] - 1) * 100 if before[key] else float('nan')
+            parts.append(f"{key} {before[key]}{unit} -> {level[key]}{unit} ({change:+.0f}%)")
+        lines.append(f"  {level['sessions']:>3} sessions: " + ', '.join(parts))
+    return lines
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 4, 16],
+                        help="concurrency levels to run, in order")
+    parser.add_argument('--reruns', type=int, default=20, help="filter changes per session")
+    parser.add_argument('--think', type=float, default=0.0,
+                        help="max random pause (seconds) before each filter change")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', help="data directory (default: NOVAMART_DATA_DIR or data/)")
+    parser.add_argument('--backend', choices=['pandas', 'duckdb'], help="query backend (default: NOVAMART_BACKEND)")
+    parser.add_argument('--out', help="also write the JSON report to this file")
+    parser.add_argument('--compare', help="earlier JSON report to compare against")
+    args = parser.parse_args()
+    report = run(args.sessions, args.reruns, args.seed, args.think, args.data_dir, args.backend)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    print(text)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        for line in compare(report, baseline):
+            print(line, file=sys.stderr)
@@ -0,0 +1,71 @@
+"""Memory accounting for the shared dataset and connected sessions."""
+import os
+import sys
+import threading
+import time
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def process_rss():
+    """Resident set size of this process in bytes (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def deep_bytes(obj):
+    """Approximate memory held by a DataFrame/Series or a container of them"""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True))
+    if hasattr(obj, 'items'):
+        return sum(deep_bytes(v) for _, v in obj.items())
+    if isinstance(obj, (list, tuple, set)):
+        return sum(deep_bytes(v) for v in obj)
+    return sys.getsizeof(obj)
+
+
+class SessionRegistry:
+    """Process-wide record of recently active browser sessions"""
+
+    def __init__(self, idle_seconds=600):
+        self.idle_seconds = idle_seconds
+        # Process RSS when a second session first connected: the cost of the
+        # interpreter, libraries, shared data and one session
+        self.baseline = None
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    def touch(self, session_id):
+        with self._lock:
+            if self.baseline is None and self._seen and session_id not in self._seen:
+                self.baseline = process_rss()
+            self._seen[session_id] = time.monotonic()
+
+    def active(self):
+        """Number of sessions seen within the idle window"""
+        cutoff = time.monotonic() - self.idle_seconds
+        with self._lock:
+            self._seen = {sid: ts for sid, ts in self._seen.items() if ts >= cutoff}
+            return len(self._seen)
+
+    def marginal_bytes(self, rss):
+        """RSS growth per active session beyond the first, or None with only one session"""
+        extra = self.active() - 1
+        if self.baseline is None or extra < 1:
+            return None
+        return max(rss - self.baseline, 0) / extra
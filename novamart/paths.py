@@ -0,0 +1,183 @@
+"""Customer journey paths as integer-coded sequences with per-depth prefix counts.
+
+A path is a sequence of touchpoint codes (indices into ``labels``). Paths
+are held as one ``(paths, MAX_STEPS)`` code matrix, padded with -1 after the
+last step, with duplicate paths merged and their customer counts summed.
+The rows are sorted lexicographically, so every prefix is a contiguous run
+of rows. Each depth of the prefix trie is therefore a set of run starts,
+and its counts come from one ``reduceat``.
+
+Level ``d`` of the trie holds one node per distinct prefix of length
+``d + 1``, as parallel arrays (code, parent node at level ``d - 1``,
+customers). Top-N paths, the path-length distribution and the step k -> k+1
+flows for a Sankey are all answered from these arrays. Labels are only
+joined into strings for the handful of paths actually displayed.
+"""
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+# Steps kept per path; longer journeys are truncated (their true length
+# still counts in the length distribution)
+MAX_STEPS = 8
+
+PAD = -1
+
+
+class Level(NamedTuple):
+    """Trie nodes at one depth, in lexicographic order of their prefixes"""
+    code: np.ndarray
+    parent: np.ndarray
+    customers: np.ndarray
+
+
+def _path_keys(matrix, base):
+    """One int64 per row that sorts like the row, or None if it would overflow"""
+    if base ** matrix.shape[1] >= 2 ** 63:
+        return None
+    keys = np.zeros(len(matrix), dtype=np.int64)
+    for d in range(matrix.shape[1]):
+        keys = keys * base + (matrix[:, d].astype(np.int64) + 1)
+    return keys
+
+
+def _unique_paths(matrix, weights, base):
+    """(sorted distinct rows, summed weight of each)"""
+    keys = _path_keys(matrix, base)
+    if keys is None:
+        rows, inverse = np.unique(matrix, axis=0, return_inverse=True)
+        return rows, np.bincount(inverse.ravel(), weights=weights, minlength=len(rows))
+    keys, inverse = np.unique(keys, return_inverse=True)
+    rows = np.empty((len(keys), matrix.shape[1]), dtype=matrix.dtype)
+    for d in range(matrix.shape[1] - 1, -1, -1):
+        keys, digit = np.divmod(keys, base)
+        rows[:, d] = digit - 1
+    return rows, np.bincount(inverse, weights=weights, minlength=len(rows))
+
+
+class PathIndex:
+    """Distinct journey paths with their customer counts and prefix trie"""
+
+    def __init__(self, matrix, weights, labels, lengths=None):
+        """``matrix``: one row of codes per journey (PAD after the last step)"""
+        self.labels = pd.Index(labels)
+        matrix = matrix[:, :MAX_STEPS]
+        weights = np.asarray(weights, dtype=np.float64)
+        if lengths is None:
+            lengths = (matrix != PAD).sum(axis=1)
+        self.length_counts = np.bincount(lengths, weights=weights)
+        self.paths, self.customers = _unique_paths(matrix, weights, len(self.labels) + 1)
+        self.steps = (self.paths != PAD).sum(axis=1)
+        self.levels = self._levels()
+
+    @classmethod
+    def from_sequences(cls, codes, journey, position, labels, weights=None):
+        """From flat per-touch arrays sorted by (journey, position)
+
+        ``weights`` is one count per journey (default 1).
+        """
+        n_journeys = int(journey[-1]) + 1 if len(journey) else 0
+        lengths = np.bincount(journey, minlength=n_journeys)
+        width = min(int(lengths.max()) if n_journeys else 0, MAX_STEPS)
+        dtype = np.int16 if len(labels) < np.iinfo(np.int16).max else np.int32
+        matrix = np.full((n_journeys, width), PAD, dtype=dtype)
+        kept = position < width
+        matrix[journey[kept], position[kept]] = codes[kept]
+        if weights is None:
+            weights = np.ones(n_journeys)
+        return cls(matrix, weights, labels, lengths)
+
+    @classmethod
+    def from_table(cls, df, count_col='customer_count', prefix='touchpoint_'):
+        """From a wide table like ``customer_journey.csv`` (one column per step, blank after the end)"""
+        steps = [c for c in df.columns if c.startswith(prefix)]
+        values = df[steps].to_numpy(dtype=object)
+        codes, labels = pd.factorize(values.ravel(), sort=True)
+        matrix = codes.reshape(values.shape).astype(np.int32)
+        return cls(matrix, df[count_col].to_numpy(), labels)
+
+    @classmethod
+    def from_events(cls, events):
+        """Converting journeys of a raw touchpoint log (see ``novamart.attribution``)"""
+        from novamart import attribution
+
+        channel, _, journey, position, _, labels = attribution.journeys(events)
+        return cls.from_sequences(channel, journey, position, labels)
+
+    def _levels(self):
+        levels = []
+        new_prefix = np.zeros(max(len(self.paths) - 1, 0), dtype=bool)
+        row_node = None
+        for d in range(self.paths.shape[1]):
+            column = self.paths[:, d]
+            new_prefix |= column[1:] != column[:-1]
+            starts = np.flatnonzero(np.r_[True, new_prefix])
+            # Rows sharing a prefix either all continue past depth d or all ended
+            present = column[starts] != PAD
+            customers = np.add.reduceat(self.customers, starts)[present]
+            parent = row_node[starts[present]] if row_node is not None else np.zeros(present.sum(), dtype=np.int64)
+            levels.append(Level(column[starts[present]].astype(np.int64), parent, customers))
+            node_of_start = np.cumsum(present) - 1
+            row_node = node_of_start[np.cumsum(np.r_[True, new_prefix]) - 1]
+        return levels
+
+    @property
+    def total(self):
+        return float(self.customers.sum())
+
+    def top_paths(self, n=10, sep=' → '):
+        """The ``n`` most common paths, largest first, as (path, steps, customers)"""
+        n = min(n, len(self.paths))
+        if n == 0:
+            return pd.DataFrame({'path': [], 'steps': [], 'customers': []})
+        top = np.argpartition(-self.customers, n - 1)[:n]
+        top = top[np.argsort(-self.customers[top], kind='stable')]
+        labels = np.asarray(self.labels, dtype=object)
+        return pd.DataFrame({
+            'path': [sep.join(labels[row[row != PAD]]) for row in self.paths[top]],
+            'steps': self.steps[top],
+            'customers': self.customers[top],
+        })
+
+    def length_distribution(self):
+        """Customers by number of steps in their journey"""
+        lengths = np.flatnonzero(self.length_counts)
+        return pd.Series(self.length_counts[lengths], index=pd.Index(lengths, name='steps'),
+                         name='customers')
+
+    def transitions(self, step):
+        """Customers moving from each touchpoint at ``step`` to each at ``step + 1`` (0-based)"""
+        if step + 1 >= len(self.levels):
+            return pd.DataFrame({'source': [], 'target': [], 'customers': []})
+        k, nxt = self.levels[step], self.levels[step + 1]
+        n = len(self.labels)
+        pair = k.code[nxt.parent] * n + nxt.code
+        flows = np.bincount(pair, weights=nxt.customers, minlength=n * n)
+        nonzero = np.flatnonzero(flows)
+        return pd.DataFrame({
+            'source': self.labels[nonzero // n],
+            'target': self.labels[nonzero % n],
+            'customers': flows[nonzero],
+        })
+
+    def count(self, prefix):
+        """Customers whose journey starts with the touchpoints in ``prefix``
+
+        Each level is sorted by (parent, code), so every step is one binary search.
+        """
+        if not prefix:
+            return self.total
+        if len(prefix) > len(self.levels):
+            return 0.0
+        n, node = len(self.labels), 0
+        for d, label in enumerate(prefix):
+            if label not in self.labels:
+                return 0.0
+            level = self.levels[d]
+            keys = level.parent * n + level.code
+            target = node * n + self.labels.get_loc(label)
+            node = int(np.searchsorted(keys, target))
+            if node == len(keys) or keys[node] != target:
+                return 0.0
+        return float(self.levels[len(prefix) - 1].customers[node])
@@ -0,0 +1,70 @@
+"""Startup profile: import time per module, data-load time, first-render time.
+
+``STARTUP`` lives for the whole server process. It is imported before
+anything heavy, so its creation time stands in for process start. The
+profile is logged once, as a single JSON line, when the first script run
+finishes. Set ``NOVAMART_PROFILE_STARTUP=1`` to also print it to stderr
+and show it in the sidebar.
+"""
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get('NOVAMART_PROFILE_STARTUP', '').lower() in ('1', 'true', 'yes')
+
+
+class StartupProfile:
+    """Timings collected while the process boots and serves its first run"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.imports = {}
+        self.phases = {}
+        self.first_render = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def importing(self, name):
+        """Time the import of ``name`` if this is its first import in the process"""
+        fresh = name not in sys.modules
+        began = time.perf_counter()
+        yield
+        if fresh:
+            with self._lock:
+                self.imports.setdefault(name, time.perf_counter() - began)
+
+    @contextmanager
+    def phase(self, name):
+        """Time a startup phase; only its first occurrence is recorded"""
+        began = time.perf_counter()
+        yield
+        with self._lock:
+            self.phases.setdefault(name, time.perf_counter() - began)
+
+    def finish_first_render(self):
+        """Mark the end of the first script run and log the profile once"""
+        with self._lock:
+            if self.first_render is not None:
+                return
+            self.first_render = time.perf_counter() - self.started
+        line = json.dumps(self.report())
+        logger.info("startup profile %s", line)
+        if ENABLED:
+            print(f"[novamart] startup profile {line}", file=sys.stderr, flush=True)
+
+    def report(self):
+        """Profile as a JSON-serializable dict (seconds)"""
+        return {
+            'imports': {k: round(v, 4) for k, v in self.imports.items()},
+            'phases': {k: round(v, 4) for k, v in self.phases.items()},
+            'first_render': None if self.first_render is None else round(self.first_render, 4),
+        }
+
+
+STARTUP = StartupProfile()
@@ -0,0 +1,245 @@
+"""Declared schema for every dataset the dashboard loads.
+
+Repeated text is stored as categorical codes, counts and scores use the
+smallest integer/float width that holds them (a column with a value that
+does not fit keeps its parsed dtype), and money stays float64 so sums keep
+full precision. Ratio columns that are pure functions of other columns are
+not stored at all: they are derived when a caller asks for them. Running
+
+    python -m novamart.schema
+
+prints the per-table memory footprint before (plain ``read_csv``) and after
+(declared schema).
+"""
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CAT = 'category'
+TEXT = 'str'
+DATE = 'datetime64[ns]'
+
+SCHEMAS = {
+    'campaign': {
+        'date': DATE, 'campaign_id': CAT, 'campaign_name': CAT, 'campaign_type': CAT,
+        'channel': CAT, 'region': CAT, 'impressions': 'int32', 'clicks': 'int32',
+        'conversions': 'int32', 'spend': 'float64', 'revenue': 'float64',
+        'day_of_week': CAT, 'month': CAT, 'quarter': CAT, 'year': 'int16',
+    },
+    'customer': {
+        'customer_id': TEXT, 'gender': CAT, 'age': 'int8', 'age_group': CAT, 'income': 'int32',
+        'income_bracket': CAT, 'region': CAT, 'city_tier': CAT, 'customer_segment': CAT,
+        'acquisition_channel': CAT, 'tenure_months': 'int16', 'lifetime_value': 'int32',
+        'total_purchases': 'int16', 'last_purchase_days': 'int16',
+        'email_open_rate': 'float32', 'website_visits_monthly': 'int16',
+        'app_sessions_monthly': 'int16', 'support_tickets': 'int8',
+        'satisfaction_score': 'float32', 'nps_category': CAT, 'is_churned': 'int8',
+        'churn_probability': 'float32',
+    },
+    'product': {
+        'product_id': TEXT, 'product_name': CAT, 'category': CAT, 'subcategory': CAT,
+        'region': CAT, 'quarter': CAT, 'year': 'int16', 'sales': 'float64',
+        'units_sold': 'int32', 'profit': 'float64', 'return_rate': 'float32',
+        'avg_rating': 'float32', 'review_count': 'int32',
+    },
+    'lead_scoring': {
+        'lead_id': TEXT, 'company_size': CAT, 'industry': CAT, 'website_visits': 'int16',
+        'pages_viewed': 'int16', 'time_on_site_seconds': 'int32', 'email_opens': 'int16',
+        'email_clicks': 'int16', 'form_submissions': 'int16', 'content_downloads': 'int16',
+        'webinar_attendance': 'int16', 'days_since_first_touch': 'int16', 'lead_source': CAT,
+        'actual_converted': 'int8', 'predicted_probability': 'float32', 'predicted_class': 'int8',
+    },
+    'feature_importance': {
+        'feature': TEXT, 'importance': 'float32', 'importance_std': 'float32',
+    },
+    'learning_curve': {
+        'training_size': 'int32', 'train_score': 'float32', 'validation_score': 'float32',
+        'train_score_std': 'float32', 'validation_score_std': 'float32',
+    },
+    'geographic': {
+        'state': TEXT, 'region': TEXT, 'latitude': 'float64', 'longitude': 'float64',
+        'total_customers': 'int32', 'total_revenue': 'int64', 'revenue_per_customer': 'float64',
+        'store_count': 'int16', 'market_penetration': 'float32', 'yoy_growth': 'float32',
+        'customer_satisfaction': 'float32', 'avg_delivery_days': 'float32',
+    },
+    'attribution': {
+        'channel': TEXT, 'first_touch': 'int32', 'last_touch': 'int32', 'linear': 'int32',
+        'time_decay': 'int32', 'position_based': 'int32',
+    },
+    'funnel': {
+        'stage': TEXT, 'visitors': 'int64', 'conversion_rate': 'float32',
+    },
+    'journey': {
+        'touchpoint_1': TEXT, 'touchpoint_2': TEXT, 'touchpoint_3': TEXT,
+        'touchpoint_4': TEXT, 'customer_count': 'int32',
+    },
+    # Optional raw touchpoint log (see novamart.attribution)
+    'events': {
+        'customer_id': CAT, 'timestamp': DATE, 'channel': CAT, 'converted': 'int8',
+    },
+    # Optional raw web/app event log, in time order (see novamart.funnel)
+    'web_events': {
+        'user_id': TEXT, 'timestamp': DATE, 'event': CAT,
+    },
+    # Square matrix: a label column followed by one float column per metric
+    'correlation': {
+        'Unnamed: 0': TEXT, '*': 'float32',
+    },
+}
+
+
+class Ratio:
+    """Derived column ``num / den * scale`` (NaN where the denominator is 0)"""
+
+    def __init__(self, num, den, scale=1):
+        self.num, self.den, self.scale = num, den, scale
+        self.inputs = [num, den]
+
+    def __call__(self, df):
+        return (df[self.num] / df[self.den].where(df[self.den] != 0) * self.scale).astype('float32')
+
+    @property
+    def sql(self):
+        """The same expression for SQL engines"""
+        return f'("{self.num}" / NULLIF("{self.den}", 0) * {self.scale})'
+
+
+# Derived column -> how to compute it from stored columns
+DERIVED = {
+    'campaign': {
+        'ctr': Ratio('clicks', 'impressions', 100),
+        'conversion_rate': Ratio('conversions', 'clicks', 100),
+        'cpc': Ratio('spend', 'clicks'),
+        'cpa': Ratio('spend', 'conversions'),
+        'roas': Ratio('revenue', 'spend'),
+    },
+    'customer': {
+        'avg_order_value': Ratio('lifetime_value', 'total_purchases'),
+    },
+    'product': {
+        'profit_margin': Ratio('profit', 'sales', 100),
+    },
+}
+
+
+def dtype_of(name, column):
+    """Declared dtype of a column, or None when the schema does not cover it"""
+    schema = SCHEMAS.get(name, {})
+    return schema.get(column, schema.get('*'))
+
+
+def physical_columns(name, columns):
+    """Stored columns needed to produce ``columns`` (None means all stored columns)"""
+    if columns is None:
+        return None
+    derived = DERIVED.get(name, {})
+    needed = []
+    for col in columns:
+        for source in (derived[col].inputs if col in derived else [col]):
+            if source not in needed:
+                needed.append(source)
+    return needed
+
+
+def fits(values, dtype):
+    """Whether casting numeric ``values`` to the numeric ``dtype`` keeps every value
+
+    A narrower integer wraps silently on overflow, and an integer dtype
+    truncates fractions and cannot hold missing values.
+    """
+    target = np.dtype(dtype)
+    values = np.asarray(values)
+    if not len(values) or values.dtype.kind not in 'iufb':
+        return True
+    if target.kind in 'iu':
+        if values.dtype.kind == 'f':
+            if np.isnan(values).any() or (values != np.floor(values)).any():
+                return False
+        info = np.iinfo(target)
+        return bool(info.min <= values.min() and values.max() <= info.max)
+    if target.kind == 'f' and values.dtype.kind == 'f':
+        finite = values[np.isfinite(values)]
+        return not len(finite) or bool(np.abs(finite).max() <= np.finfo(target).max)
+    return True
+
+
+def apply(name, df):
+    """Cast a freshly parsed frame to its declared dtypes and drop derivable columns
+
+    Numeric columns are only narrowed when every value fits the declared
+    dtype; otherwise they keep the dtype they were parsed with.
+    """
+    df = df.drop(columns=[c for c in DERIVED.get(name, {}) if c in df.columns])
+    for col in df.columns:
+        dtype = dtype_of(name, col)
+        if dtype is None or str(df[col].dtype) == dtype:
+            continue
+        if dtype == DATE:
+            df[col] = pd.to_datetime(df[col])
+        elif dtype in (CAT, TEXT) or fits(df[col], dtype):
+            df[col] = df[col].astype(dtype)
+        else:
+            logger.warning("%s.%s does not fit %s; keeping %s", name, col, dtype, df[col].dtype)
+    return df
+
+
+def project(name, df, columns):
+    """Add requested derived columns and return exactly ``columns`` in order"""
+    if columns is None:
+        return df
+    derived = DERIVED.get(name, {})
+    missing = [c for c in columns if c in derived and c not in df.columns]
+    if missing:
+        df = df.assign(**{c: derived[c](df) for c in missing})
+    return df[columns]
+
+
+def concat(frames):
+    """``pd.concat`` that keeps categorical columns categorical
+
+    Frames parsed at different times can see different category sets; they
+    are widened to their sorted union first (a no-op when they already agree).
+    """
+    frames = list(frames)
+    for col in frames[0].columns:
+        dtypes = [f[col].dtype for f in frames]
+        if not all(isinstance(d, pd.CategoricalDtype) for d in dtypes):
+            continue
+        if all(d == dtypes[0] for d in dtypes[1:]):
+            continue
+        categories = dtypes[0].categories
+        for d in dtypes[1:]:
+            categories = categories.union(d.categories)
+        frames = [f.assign(**{col: f[col].cat.set_categories(categories)}) for f in frames]
+    return pd.concat(frames, ignore_index=True)
+
+
+def memory_report():
+    """Per-table memory before (default read_csv) and after (declared schema)"""
+    from novamart import store
+
+    rows = []
+    for name in store.available():
+        raw = pd.read_csv(store.csv_path(name))
+        typed = store.read_csv(name)
+        before = raw.memory_usage(index=True, deep=True).sum()
+        after = typed.memory_usage(index=True, deep=True).sum()
+        rows.append({
+            'table': name,
+            'rows': len(raw),
+            'columns_before': raw.shape[1],
+            'columns_after': typed.shape[1],
+            'before_mb': before / 1e6,
+            'after_mb': after / 1e6,
+            'reduction_pct': (1 - after / before) * 100 if before else 0.0,
+        })
+    return pd.DataFrame(rows)
+
+
+if __name__ == '__main__':
+    report = memory_report()
+    print(report.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    print(f"\ntotal: {report['before_mb'].sum():.2f} MB -> {report['after_mb'].sum():.2f} MB")
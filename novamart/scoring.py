@@ -0,0 +1,96 @@
+"""Histogram-based evaluation of the lead scoring model.
+
+Predicted probabilities are bucketed into fixed score bins, counting actual
+positives and negatives per bin, in one vectorized pass per chunk. ROC,
+AUC, the confusion matrix at any bin-aligned threshold and precision/recall
+are all cumulative sums over those bins, so a threshold slider never goes
+back to the raw leads and files larger than memory can be streamed.
+"""
+import numpy as np
+
+DEFAULT_BINS = 1000
+
+
+class ScoreHistogram:
+    """Positive/negative label counts per predicted-probability bin"""
+
+    def __init__(self, bins=DEFAULT_BINS):
+        self.bins = bins
+        # One extra bin at the top holds probability 1.0 on its own
+        self.pos = np.zeros(bins + 1, dtype=np.int64)
+        self.neg = np.zeros(bins + 1, dtype=np.int64)
+
+    def bin_of(self, probabilities):
+        """Bin index of each probability
+
+        Bin k < bins holds [k / bins, (k + 1) / bins); bin ``bins`` holds 1.0,
+        so a threshold of 1.0 still selects exactly the leads scored 1.0.
+        """
+        scaled = np.asarray(probabilities, dtype=float) * self.bins
+        # Scores are stored at limited precision (float32, 4 dp), so a value
+        # meant to sit exactly on a bin edge must not round down below it
+        return np.clip(np.floor(np.round(scaled, 3)), 0, self.bins).astype(np.int64)
+
+    def add(self, probabilities, labels):
+        """Fold one chunk of (probability, 0/1 label) pairs into the counts"""
+        idx = self.bin_of(probabilities)
+        labels = np.asarray(labels).astype(bool)
+        self.pos += np.bincount(idx[labels], minlength=self.bins + 1)
+        self.neg += np.bincount(idx[~labels], minlength=self.bins + 1)
+        return self
+
+    @classmethod
+    def from_chunks(cls, chunks, prob_col='predicted_probability', label_col='actual_converted',
+                    bins=DEFAULT_BINS):
+        """Build from an iterable of DataFrame chunks"""
+        hist = cls(bins)
+        for chunk in chunks:
+            hist.add(chunk[prob_col].to_numpy(), chunk[label_col].to_numpy())
+        return hist
+
+    def copy(self):
+        hist = ScoreHistogram(self.bins)
+        hist.pos[:], hist.neg[:] = self.pos, self.neg
+        return hist
+
+    @property
+    def total(self):
+        return int(self.pos.sum() + self.neg.sum())
+
+    def threshold_index(self, threshold):
+        """First bin predicted positive at ``threshold`` (snapped to a bin edge)"""
+        return int(np.clip(round(threshold * self.bins), 0, self.bins))
+
+    def confusion(self, threshold=0.5):
+        """2x2 matrix [[TN, FP], [FN, TP]] for ``probability >= threshold``"""
+        k = self.threshold_index(threshold)
+        tp, fn = self.pos[k:].sum(), self.pos[:k].sum()
+        fp, tn = self.neg[k:].sum(), self.neg[:k].sum()
+        return np.array([[tn, fp], [fn, tp]])
+
+    def precision_recall(self, threshold=0.5):
+        """(precision, recall) at ``threshold``; NaN where undefined"""
+        (tn, fp), (fn, tp) = self.confusion(threshold)
+        precision = tp / (tp + fp) if tp + fp else float('nan')
+        recall = tp / (tp + fn) if tp + fn else float('nan')
+        return precision, recall
+
+    def roc(self):
+        """(fpr, tpr, thresholds) sweeping the threshold from the top bin down
+
+        Empty bins add no new operating point and are skipped.
+        """
+        tp = np.concatenate([[0], np.cumsum(self.pos[::-1])])
+        fp = np.concatenate([[0], np.cumsum(self.neg[::-1])])
+        keep = np.concatenate([[True], (self.pos + self.neg)[::-1] > 0])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            tpr = tp / tp[-1]
+            fpr = fp / fp[-1]
+        # The first point predicts nothing positive: no threshold in [0, 1] does that
+        thresholds = np.r_[np.inf, np.arange(self.bins, -1, -1) / self.bins]
+        return fpr[keep], tpr[keep], thresholds[keep]
+
+    def auc(self):
+        """Area under the ROC curve (trapezoidal; ties within a bin count as half)"""
+        fpr, tpr, _ = self.roc()
+        return float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
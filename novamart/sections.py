@@ -0,0 +1,740 @@
+"""Dashboard sections.
+
+Each section of the dashboard is a self-contained render function taking a
+``SectionContext``. The app only calls the function for the section the
+user is looking at, so the others cost nothing on a rerun.
+
+Every chart is drawn through the shared figure cache: its aggregation and
+Plotly construction live in a ``build`` closure that only runs on a cache
+miss for the chart's (section, chart, state) key.
+"""
+import time
+from functools import partial
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from novamart import cohorts, cube, density, downsample, tracing
+from novamart.figcache import FigureCache
+from novamart.paths import PathIndex
+from novamart.profiling import STARTUP
+from novamart.scoring import ScoreHistogram
+from novamart.timeseries import FREQUENCIES
+
+
+class Filters(NamedTuple):
+    """Sidebar filter state"""
+    region: str
+    channel: str
+    start: pd.Timestamp
+    end: pd.Timestamp
+
+
+class SectionContext(NamedTuple):
+    """Everything a section needs to render, all from one data snapshot
+
+    ``data_version`` orders snapshots (newer compares greater) for the
+    figure cache.
+    """
+    data: dict
+    backend: object
+    campaign_cube: pd.DataFrame
+    engine: object
+    lead_scores: ScoreHistogram
+    journey_paths: PathIndex
+    hierarchies: dict
+    filters: Filters
+    figures: FigureCache
+    data_version: tuple
+
+
+def _plotly():
+    """plotly.express and graph_objects, imported when the first section renders"""
+    with STARTUP.importing('plotly.express'):
+        import plotly.express as px
+        import plotly.graph_objects as go
+    return px, go
+
+
+def _plot(ctx, section, chart, build, *state):
+    """Draw a chart, building it only if the figure cache has no entry for its state"""
+    key = ctx.figures.key(section, chart, *state)
+    with tracing.span(f'{section}/{chart}', 'chart') as span:
+        if tracing.active():
+            info = {}
+            spec = ctx.figures.get_or_build(key, ctx.data_version, partial(_traced_build, build), info)
+            span.set(**info, traces=len(spec.get('data', ())))
+        else:
+            spec = ctx.figures.get_or_build(key, ctx.data_version, build)
+        # A filter that matches nothing leaves a figure without traces, which plotly_chart rejects
+        if not spec.get('data'):
+            st.info("No data for the selected filters.")
+            return
+        st.plotly_chart(spec, use_container_width=True)
+
+
+def _traced_build(build):
+    with tracing.span('build', 'figure'):
+        return build()
+
+
+def _hierarchy_figure(trace, index, colorscale, value_name):
+    """Sunburst / treemap of a HierarchyIndex (top-K children per node plus "Other")"""
+    _, go = _plotly()
+    nodes = index.nodes()
+    return go.Figure(trace(
+        ids=nodes['id'], parents=nodes['parent'], labels=nodes['label'], values=nodes['value'],
+        branchvalues='total',
+        marker={'colors': nodes['value'], 'colorscale': colorscale, 'showscale': True,
+                'colorbar': {'title': {'text': value_name}}},
+        hovertemplate=f'%{{label}}<br>{value_name}=%{{value:,.0f}}<extra></extra>',
+    ))
+
+
+def render_campaign_performance(ctx):
+    """Tab 1: campaign performance"""
+    px, go = _plotly()
+    plot = partial(_plot, ctx, 'campaign')
+    filters = ctx.filters
+    engine = ctx.engine
+    filtered_cube = cube.slice_cube(ctx.campaign_cube, filters.region, filters.channel,
+                                    filters.start, filters.end)
+    # The bar and bubble charts below are all rollups of one grouping pass
+    plan = cube.GroupingPlan(filtered_cube, ['channel', 'campaign_type', ['region', 'quarter'],
+                                             ['month', 'campaign_type']])
+
+    st.header("📈 Campaign Performance Analysis")
+
+    # Revenue by Channel - Bar Chart
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.subheader("Revenue by Channel")
+        channel_revenue = plan.rollup('channel', ['revenue'])
+        channel_revenue = channel_revenue.sort_values('revenue', ascending=False)
+        def build():
+            fig = px.bar(channel_revenue, x='channel', y='revenue',
+                         color='revenue', color_continuous_scale='Blues',
+                         labels={'revenue': 'Revenue (₹)', 'channel': 'Marketing Channel'})
+            fig.update_layout(showlegend=False, height=400)
+            return fig
+        plot('revenue_by_channel', build, *filters)
+
+        if len(channel_revenue):
+            st.markdown(f"""
+            <div class="insight-box">
+            <b>💡 Insight:</b> {channel_revenue.iloc[0]['channel']} is the top-performing channel
+            with ₹{channel_revenue.iloc[0]['revenue']/1e6:.2f}M in revenue.
+            </div>
+            """, unsafe_allow_html=True)
+
+    with col2:
+        st.subheader("Revenue by Campaign Type")
+        def build():
+            type_revenue = plan.rollup('campaign_type', ['revenue'])
+            fig = px.bar(type_revenue, x='campaign_type', y='revenue',
+                         color='campaign_type', color_discrete_sequence=px.colors.qualitative.Set2)
+            fig.update_layout(showlegend=False, height=400)
+            return fig
+        plot('revenue_by_campaign_type', build, *filters)
+
+    # Grouped Bar Chart - Region x Quarter
+    st.subheader("Regional Performance by Quarter")
+    def build():
+        region_quarter = plan.rollup(['region', 'quarter'], ['revenue'])
+        fig = px.bar(region_quarter, x='region', y='revenue', color='quarter',
+                     barmode='group', color_discrete_sequence=px.colors.qualitative.Pastel)
+        fig.update_layout(height=400)
+        return fig
+    plot('region_quarter', build, *filters)
+
+    granularity = st.radio("Trend granularity", list(FREQUENCIES), horizontal=True)
+    freq = FREQUENCIES[granularity]
+
+    # Line Chart - Revenue Trend
+    st.subheader(f"{granularity} Revenue Trend")
+    def build():
+        daily_revenue = engine.resample('revenue', filters.start, filters.end,
+                                        filters.region, filters.channel, freq=freq)
+        daily_revenue = downsample.downsample(daily_revenue, 'date', 'revenue', downsample.max_points(1))
+        fig = px.line(daily_revenue, x='date', y='revenue',
+                      labels={'revenue': 'Revenue (₹)', 'date': 'Date'})
+        fig.update_traces(line_color='#1f77b4', line_width=2)
+        fig.update_layout(height=400, hovermode='x unified')
+        return fig
+    plot('revenue_trend', build, *filters, freq)
+
+    # Area Chart - Conversions by Channel over Time
+    st.subheader("Conversions by Channel Over Time")
+    def build():
+        channel_time = engine.resample('conversions', filters.start, filters.end,
+                                       filters.region, filters.channel, freq=freq, by='channel')
+        channel_time = downsample.downsample(channel_time, 'date', 'conversions',
+                                             downsample.max_points(1), by='channel')
+        fig = px.area(channel_time, x='date', y='conversions', color='channel',
+                      color_discrete_sequence=px.colors.qualitative.Set3)
+        fig.update_layout(height=400, hovermode='x unified')
+        return fig
+    plot('conversions_by_channel', build, *filters, freq)
+
+    # Stacked Bar - Monthly Spend by Campaign Type
+    st.subheader("Monthly Spend by Campaign Type")
+    def build():
+        # Cube months are ordered by calendar, so the rollup comes back in Jan..Dec order
+        monthly_spend = plan.rollup(['month', 'campaign_type'], ['spend'])
+        fig = px.bar(monthly_spend, x='month', y='spend', color='campaign_type',
+                     barmode='stack', color_discrete_sequence=px.colors.qualitative.Bold)
+        fig.update_layout(height=400)
+        return fig
+    plot('monthly_spend', build, *filters)
+
+    # Bubble Chart - CTR vs Conversion Rate vs Spend
+    st.subheader("Campaign Efficiency: CTR vs Conversion Rate (Bubble Size = Spend)")
+    def build():
+        campaign_agg = cube.add_ratios(plan.rollup('campaign_type'))
+        fig = px.scatter(campaign_agg, x='ctr', y='conversion_rate',
+                         size='spend', color='campaign_type', hover_data=['roas'],
+                         labels={'ctr': 'Click-Through Rate (%)',
+                                'conversion_rate': 'Conversion Rate (%)',
+                                'spend': 'Total Spend (₹)'},
+                         size_max=60)
+        fig.update_layout(height=400)
+        return fig
+    plot('efficiency_bubble', build, *filters)
+
+
+def _density_figure(df, x, y, by, colors, show_outliers):
+    """Per-group density contours with an optional overlay of extreme points"""
+    _, go = _plotly()
+    groups, x_edges, y_edges, counts = density.binned_density(df, x, y, by)
+    x_mid, y_mid = density.bin_centers(x_edges), density.bin_centers(y_edges)
+    fig = go.Figure()
+    for i, group in enumerate(groups):
+        color = colors[i % len(colors)]
+        fig.add_trace(go.Contour(
+            x=x_mid, y=y_mid, z=np.log1p(counts[i].T), name=str(group),
+            contours_coloring='lines', line=dict(color=color, width=1.5),
+            colorscale=[[0, color], [1, color]], showscale=False, showlegend=True,
+            hovertemplate=f"{group}<extra></extra>",
+        ))
+    if show_outliers:
+        extreme = density.outliers(df, x, y)
+        for i, group in enumerate(groups):
+            rows = extreme[extreme[by] == group]
+            fig.add_trace(go.Scatter(
+                x=rows[x], y=rows[y], mode='markers', name=f"{group} (extreme)",
+                marker=dict(color=colors[i % len(colors)], size=5), showlegend=False,
+            ))
+    fig.update_layout(xaxis_title=x, yaxis_title=y)
+    return fig
+
+
+def render_customer_analytics(ctx):
+    """Tab 2: customer analytics"""
+    px, go = _plotly()
+    plot = partial(_plot, ctx, 'customer')
+    data = ctx.data
+
+    st.header("👥 Customer Analytics")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        # Histogram - Age Distribution
+        st.subheader("Customer Age Distribution")
+        def build():
+            fig = px.histogram(data['customer'], x='age', nbins=30,
+                              color_discrete_sequence=['#636EFA'])
+            fig.update_layout(showlegend=False, height=400)
+            return fig
+        plot('age_distribution', build)
+
+    with col2:
+        # Pie Chart - Customer Segments
+        st.subheader("Customer Segment Distribution")
+        def build():
+            segment_dist = data['customer']['customer_segment'].value_counts().reset_index()
+            segment_dist.columns = ['segment', 'count']
+            fig = px.pie(segment_dist, values='count', names='segment',
+                        color_discrete_sequence=px.colors.qualitative.Set2,
+                        hole=0.4)
+            fig.update_layout(height=400)
+            return fig
+        plot('segment_distribution', build)
+
+    # Box Plot - Lifetime Value by Segment
+    st.subheader("Lifetime Value Distribution by Customer Segment")
+    def build():
+        fig = px.box(data['customer'], x='customer_segment', y='lifetime_value',
+                     color='customer_segment', color_discrete_sequence=px.colors.qualitative.Pastel)
+        fig.update_layout(showlegend=False, height=400)
+        return fig
+    plot('ltv_by_segment', build)
+
+    st.markdown(f"""
+    <div class="insight-box">
+    <b>💡 Key Finding:</b> Premium customers have an average LTV of
+    ₹{data['customer'][data['customer']['customer_segment']=='Premium']['lifetime_value'].mean():,.0f},
+    which is 2.5x higher than Basic customers.
+    </div>
+    """, unsafe_allow_html=True)
+
+    # Violin Plot - Satisfaction Score by NPS Category
+    st.subheader("Satisfaction Score Distribution by NPS Category")
+    def build():
+        fig = px.violin(data['customer'], x='nps_category', y='satisfaction_score',
+                        color='nps_category', box=True,
+                        color_discrete_sequence=px.colors.qualitative.Set3)
+        fig.update_layout(showlegend=False, height=400)
+        return fig
+    plot('satisfaction_by_nps', build)
+
+    # Scatter Plot - Income vs Lifetime Value
+    st.subheader("Income vs Lifetime Value (colored by Customer Segment)")
+    use_density = len(data['customer']) > density.DENSITY_THRESHOLD
+    show_outliers = False
+    if use_density:
+        # Too many customers to draw one marker each: per-segment density contours
+        show_outliers = st.checkbox("Overlay extreme customers", value=True)
+        st.caption(f"Density view of {len(data['customer']):,} customers")
+    def build():
+        if use_density:
+            fig = _density_figure(data['customer'], 'income', 'lifetime_value', 'customer_segment',
+                                  px.colors.qualitative.Bold, show_outliers)
+        else:
+            fig = px.scatter(data['customer'], x='income', y='lifetime_value',
+                            color='customer_segment', size='total_purchases',
+                            hover_data=['age', 'tenure_months'],
+                            color_discrete_sequence=px.colors.qualitative.Bold)
+        fig.update_layout(height=500)
+        return fig
+    plot('income_vs_ltv', build, show_outliers)
+
+    # Heatmap - Cohort Retention / LTV by months since acquisition
+    st.subheader("Cohort Retention & Lifetime Value")
+    col1, col2 = st.columns(2)
+    with col1:
+        cohort_by = st.selectbox("Cohort", list(cohorts.COHORTS), format_func=cohorts.COHORTS.get)
+    with col2:
+        metric = st.radio("Metric", ['retention', 'ltv'], horizontal=True,
+                          format_func={'retention': 'Retention %', 'ltv': 'Avg cumulative LTV (₹)'}.get)
+    region = ctx.filters.region
+    if region != 'All':
+        st.caption(f"Customers in {region}")
+    def build():
+        customers = data['customer']
+        if region != 'All':
+            customers = customers[customers['region'] == region]
+        matrix = cohorts.build(customers, cohort_by)
+        fig = go.Figure(go.Heatmap(
+            z=getattr(matrix, metric), x=matrix.months, y=matrix.cohorts,
+            customdata=matrix.customers,
+            colorscale='Blues' if metric == 'retention' else 'Greens',
+            hovertemplate=('%{y}, month %{x}: %{z:,.1f}<br>%{customdata:,} customers observed'
+                           '<extra></extra>'),
+        ))
+        fig.update_layout(height=400, xaxis_title='Months since acquisition',
+                          yaxis={'autorange': 'reversed'})
+        return fig
+    plot('cohorts', build, region, cohort_by, metric)
+
+    # Sunburst - Region > City Tier > Customer Segment
+    st.subheader("Customer Hierarchy: Region → City Tier → Segment")
+    def build():
+        fig = _hierarchy_figure(go.Sunburst, ctx.hierarchies['customer'], 'Blues', 'count')
+        fig.update_layout(height=500)
+        return fig
+    plot('hierarchy', build)
+
+
+def render_product_insights(ctx):
+    """Tab 3: product insights"""
+    px, go = _plotly()
+    plot = partial(_plot, ctx, 'product')
+
+    st.header("🛍️ Product Sales Insights")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        # Bar Chart - Category Performance
+        st.subheader("Sales by Product Category")
+        def build():
+            category_sales = ctx.backend.aggregate('product', ['category'], {'sales': 'sum'})
+            category_sales = category_sales.sort_values('sales', ascending=False)
+            fig = px.bar(category_sales, x='category', y='sales',
+                        color='sales', color_continuous_scale='Greens')
+            fig.update_layout(showlegend=False, height=400)
+            return fig
+        plot('sales_by_category', build)
+
+    with col2:
+        # Bar Chart - Profit Margin by Category
+        st.subheader("Average Profit Margin by Category")
+        def build():
+            margin_data = ctx.backend.aggregate('product', ['category'], {'profit_margin': 'mean'})
+            fig = px.bar(margin_data, x='category', y='profit_margin',
+                        color='profit_margin', color_continuous_scale='RdYlGn')
+            fig.update_layout(showlegend=False, height=400)
+            return fig
+        plot('margin_by_category', build)
+
+    # Treemap - Category > Subcategory > Product
+    st.subheader("Product Sales Treemap")
+    def build():
+        # Top products per subcategory; the rest of each subcategory is one "Other" tile
+        fig = _hierarchy_figure(go.Treemap, ctx.hierarchies['product'], 'Viridis', 'sales')
+        fig.update_layout(height=500)
+        return fig
+    plot('treemap', build)
+
+    # Quarterly Sales Trend
+    st.subheader("Quarterly Sales Trend by Category")
+    def build():
+        quarterly_sales = ctx.backend.aggregate('product', ['quarter', 'category'], {'sales': 'sum'})
+        fig = px.line(quarterly_sales, x='quarter', y='sales', color='category',
+                     markers=True, color_discrete_sequence=px.colors.qualitative.Set2)
+        fig.update_layout(height=400)
+        return fig
+    plot('quarterly_trend', build)
+
+    # Regional Performance
+    st.subheader("Regional Product Performance")
+    def build():
+        regional_sales = ctx.backend.aggregate('product', ['region', 'category'], {'sales': 'sum'})
+        fig = px.bar(regional_sales, x='region', y='sales', color='category',
+                    barmode='group', color_discrete_sequence=px.colors.qualitative.Pastel)
+        fig.update_layout(height=400)
+        return fig
+    plot('regional_sales', build)
+
+
+def render_ml_models(ctx):
+    """Tab 4: ML model performance"""
+    px, go = _plotly()
+    plot = partial(_plot, ctx, 'ml')
+    data = ctx.data
+
+    st.header("🤖 Machine Learning Model Performance")
+
+    scores = ctx.lead_scores
+    threshold = st.slider("Decision threshold", 0.0, 1.0, 0.5, step=0.01,
+                          help="Leads scoring at or above the threshold are predicted to convert")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        # Confusion Matrix
+        st.subheader("Lead Scoring: Confusion Matrix")
+        cm = scores.confusion(threshold)
+        def build():
+            fig = go.Figure(data=go.Heatmap(
+                z=cm,
+                x=['Predicted 0', 'Predicted 1'],
+                y=['Actual 0', 'Actual 1'],
+                colorscale='Blues',
+                text=cm,
+                texttemplate='%{text}',
+                textfont={"size": 20}
+            ))
+            fig.update_layout(height=400)
+            return fig
+        plot('confusion_matrix', build, threshold)
+
+        accuracy = (cm[0,0] + cm[1,1]) / cm.sum()
+        # Precision is undefined when no lead is predicted positive, recall when none converted
+        precision, recall = (f"{v*100:.1f}%" if np.isfinite(v) else "n/a"
+                             for v in scores.precision_recall(threshold))
+        st.info(f"**Model Accuracy:** {accuracy*100:.2f}% · **Precision:** {precision} "
+                f"· **Recall:** {recall}")
+
+    with col2:
+        # ROC Curve
+        st.subheader("ROC Curve")
+        roc_auc = scores.auc()
+        def build():
+            fpr, tpr, _ = scores.roc()
+            # One point per histogram bin; the curve sits in a half-width column
+            kept = downsample.lttb_indices(fpr, tpr, downsample.max_points(0.5))
+            fpr, tpr = fpr[kept], tpr[kept]
+            (tn, fp), (fn, tp) = cm
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(x=fpr, y=tpr, name=f'ROC (AUC = {roc_auc:.3f})',
+                                    line=dict(color='#1f77b4', width=3)))
+            fig.add_trace(go.Scatter(x=[0, 1], y=[0, 1], name='Random',
+                                    line=dict(color='gray', dash='dash')))
+            fig.add_trace(go.Scatter(x=[fp / max(fp + tn, 1)], y=[tp / max(tp + fn, 1)],
+                                    name=f'Threshold {threshold:.2f}', mode='markers',
+                                    marker=dict(color='#ff7f0e', size=12)))
+            fig.update_layout(xaxis_title='False Positive Rate',
+                             yaxis_title='True Positive Rate',
+                             height=400)
+            return fig
+        plot('roc_curve', build, threshold)
+
+        st.success(f"**AUC Score:** {roc_auc:.3f} - Good predictive performance!")
+
+    # Feature Importance
+    st.subheader("Feature Importance Analysis")
+    feature_df = data['feature_importance'].sort_values('importance', ascending=False)
+    def build():
+        fig = px.bar(feature_df, x='importance', y='feature', orientation='h',
+                    color='importance', color_continuous_scale='Reds',
+                    error_x='importance_std')
+        fig.update_layout(yaxis={'categoryorder':'total ascending'}, height=400)
+        return fig
+    plot('feature_importance', build)
+
+    st.markdown(f"""
+    <div class="insight-box">
+    <b>🎯 Top Predictors:</b> {feature_df.iloc[0]['feature']} and {feature_df.iloc[1]['feature']}
+    are the strongest indicators of lead conversion.
+    </div>
+    """, unsafe_allow_html=True)
+
+    # Learning Curve
+    st.subheader("Model Learning Curve")
+    def build():
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=data['learning_curve']['training_size'],
+                                y=data['learning_curve']['train_score'],
+                                name='Training Score', mode='lines+markers',
+                                line=dict(color='#1f77b4', width=3)))
+        fig.add_trace(go.Scatter(x=data['learning_curve']['training_size'],
+                                y=data['learning_curve']['validation_score'],
+                                name='Validation Score', mode='lines+markers',
+                                line=dict(color='#ff7f0e', width=3)))
+        fig.update_layout(xaxis_title='Training Size',
+                         yaxis_title='Score',
+                         height=400, hovermode='x unified')
+        return fig
+    plot('learning_curve', build)
+
+
+def render_geographic_analysis(ctx):
+    """Tab 5: geographic analysis"""
+    px, go = _plotly()
+    plot = partial(_plot, ctx, 'geographic')
+    data = ctx.data
+
+    st.header("🗺️ Geographic Performance Analysis")
+
+    # Choropleth Map
+    st.subheader("Revenue by State (Choropleth Map)")
+    def build():
+        fig = px.scatter_geo(data['geographic'],
+                            lat='latitude', lon='longitude',
+                            size='total_revenue',
+                            color='revenue_per_customer',
+                            hover_name='state',
+                            hover_data=['total_customers', 'store_count', 'customer_satisfaction'],
+                            color_continuous_scale='Viridis',
+                            size_max=50)
+        fig.update_geos(scope='asia', showcountries=True)
+        fig.update_layout(height=500)
+        return fig
+    plot('revenue_map', build)
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        # Top States by Revenue
+        st.subheader("Top 10 States by Revenue")
+        def build():
+            top_states = data['geographic'].nlargest(10, 'total_revenue')
+            fig = px.bar(top_states, x='state', y='total_revenue',
+                        color='total_revenue', color_continuous_scale='Blues')
+            fig.update_layout(showlegend=False, height=400)
+            return fig
+        plot('top_states', build)
+
+    with col2:
+        # YoY Growth by Region
+        st.subheader("Year-over-Year Growth by Region")
+        def build():
+            regional_growth = data['geographic'].groupby('region')['yoy_growth'].mean().reset_index()
+            fig = px.bar(regional_growth, x='region', y='yoy_growth',
+                        color='yoy_growth', color_continuous_scale='RdYlGn')
+            fig.update_layout(showlegend=False, height=400)
+            return fig
+        plot('yoy_growth', build)
+
+    # Bubble Map - Store Count vs Satisfaction
+    st.subheader("Store Distribution & Customer Satisfaction")
+    def build():
+        fig = px.scatter_geo(data['geographic'],
+                            lat='latitude', lon='longitude',
+                            size='store_count',
+                            color='customer_satisfaction',
+                            hover_name='state',
+                            hover_data=['total_customers', 'market_penetration'],
+                            color_continuous_scale='RdYlGn',
+                            size_max=40)
+        fig.update_geos(scope='asia')
+        fig.update_layout(height=500)
+        return fig
+    plot('store_map', build)
+
+    # Market Penetration Analysis
+    st.subheader("Market Penetration vs Customer Satisfaction")
+    def build():
+        fig = px.scatter(data['geographic'], x='market_penetration', y='customer_satisfaction',
+                        size='total_customers', color='region', hover_name='state',
+                        labels={'market_penetration': 'Market Penetration (%)',
+                               'customer_satisfaction': 'Customer Satisfaction'},
+                        color_discrete_sequence=px.colors.qualitative.Set2)
+        fig.update_layout(height=400)
+        return fig
+    plot('penetration_vs_satisfaction', build)
+
+
+# Paths in the "Customer Journey Paths" bar chart
+TOP_JOURNEY_PATHS = 15
+
+
+def render_attribution_funnel(ctx):
+    """Tab 6: attribution models & conversion funnel"""
+    px, go = _plotly()
+    plot = partial(_plot, ctx, 'attribution')
+    data = ctx.data
+
+    st.header("🔄 Attribution Models & Conversion Funnel")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        # Multi-Touch Attribution Models
+        st.subheader("Channel Attribution Comparison")
+        if 'journeys' in data['attribution'].attrs:
+            st.caption(f"Computed from {data['attribution'].attrs['journeys']:,} converting journeys "
+                       f"(% of conversions credited to each channel)")
+        def build():
+            attribution_melted = data['attribution'].melt(id_vars=['channel'],
+                                                          var_name='model',
+                                                          value_name='conversions')
+            fig = px.bar(attribution_melted, x='channel', y='conversions',
+                        color='model', barmode='group',
+                        color_discrete_sequence=px.colors.qualitative.Set3)
+            fig.update_layout(height=400)
+            return fig
+        plot('attribution_comparison', build)
+
+    with col2:
+        # Attribution Donut Chart - Last Touch Model
+        st.subheader("Last Touch Attribution")
+        def build():
+            fig = px.pie(data['attribution'], values='last_touch', names='channel',
+                        hole=0.5, color_discrete_sequence=px.colors.qualitative.Pastel)
+            fig.update_layout(height=400)
+            return fig
+        plot('last_touch', build)
+
+    # Conversion Funnel
+    st.subheader("Marketing Conversion Funnel")
+    def build():
+        fig = go.Figure(go.Funnel(
+            y=data['funnel']['stage'],
+            x=data['funnel']['visitors'],
+            textposition="inside",
+            textinfo="value+percent initial",
+            marker={"color": ["#636EFA", "#EF553B", "#00CC96", "#AB63FA", "#FFA15A", "#19D3F3"]}
+        ))
+        fig.update_layout(height=500)
+        return fig
+    plot('funnel', build)
+
+    # Funnel Conversion Rates
+    funnel = data['funnel']
+    if 'sessions' in funnel.attrs:
+        st.caption(f"Computed from {funnel.attrs['sessions']:,} sessions of the web event log "
+                   f"(conversion rate = share of the previous stage)")
+    columns = st.columns(3)
+    rates = [f"{rate:.1f}%" if pd.notna(rate) else "" for rate in funnel['conversion_rate'].tolist()]
+    for idx, (stage, visitors, rate) in enumerate(zip(funnel['stage'].tolist(),
+                                                      funnel['visitors'].tolist(), rates)):
+        if idx >= 6:
+            break
+        with columns[idx // 3]:
+            st.metric(stage, f"{visitors:,}", rate)
+
+    # Customer Journey Analysis
+    st.subheader("Customer Journey Paths")
+    paths = ctx.journey_paths
+    def build():
+        journey_data = paths.top_paths(TOP_JOURNEY_PATHS)
+        fig = px.bar(journey_data, x='customers', y='path', orientation='h',
+                    color='customers', color_continuous_scale='Teal')
+        fig.update_layout(yaxis={'categoryorder':'total ascending'}, height=400)
+        return fig
+    plot('journey_paths', build)
+
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        st.subheader("Journey Flow")
+        def build():
+            # One Sankey node per (step, touchpoint); links are the step k -> k+1 flows
+            flows = [paths.transitions(k).assign(step=k) for k in range(len(paths.levels) - 1)]
+            flows = pd.concat(flows, ignore_index=True) if flows else pd.DataFrame(
+                {'source': [], 'target': [], 'customers': [], 'step': []})
+            source = pd.MultiIndex.from_arrays([flows['step'], flows['source']])
+            target = pd.MultiIndex.from_arrays([flows['step'] + 1, flows['target']])
+            nodes = source.append(target).unique()
+            fig = go.Figure(go.Sankey(
+                node={'label': [label for _, label in nodes], 'pad': 15},
+                link={'source': nodes.get_indexer(source), 'target': nodes.get_indexer(target),
+                      'value': flows['customers']},
+            ))
+            fig.update_layout(height=400)
+            return fig
+        plot('journey_flow', build)
+
+    with col2:
+        st.subheader("Journey Length")
+        def build():
+            lengths = paths.length_distribution().reset_index()
+            fig = px.bar(lengths, x='steps', y='customers',
+                         labels={'steps': 'Touchpoints', 'customers': 'Customers'},
+                         color_discrete_sequence=['#00CC96'])
+            fig.update_layout(height=400)
+            return fig
+        plot('journey_length', build)
+
+    # Correlation Heatmap
+    st.subheader("Marketing Metrics Correlation Matrix")
+    def build():
+        corr_matrix = data['correlation'].set_index(data['correlation'].columns[0])
+        fig = go.Figure(data=go.Heatmap(
+            z=corr_matrix.values,
+            x=corr_matrix.columns,
+            y=corr_matrix.index,
+            colorscale='RdBu',
+            zmid=0,
+            text=np.round(corr_matrix.values, 2),
+            texttemplate='%{text}',
+            textfont={"size": 10}
+        ))
+        fig.update_layout(height=500)
+        return fig
+    plot('correlation', build)
+
+
+# Section label -> render function, in display order
+SECTIONS = {
+    "📈 Campaign Performance": render_campaign_performance,
+    "👥 Customer Analytics": render_customer_analytics,
+    "🛍️ Product Insights": render_product_insights,
+    "🤖 ML Models": render_ml_models,
+    "🗺️ Geographic Analysis": render_geographic_analysis,
+    "🔄 Attribution & Funnel": render_attribution_funnel,
+}
+
+
+def render_section(label, ctx):
+    """Render one section and return its wall time in seconds"""
+    started = time.perf_counter()
+    with tracing.span(label, 'section'):
+        SECTIONS[label](ctx)
+    return time.perf_counter() - started
@@ -0,0 +1,197 @@
+"""Dataset loading for the NovaMart dashboard.
+
+The CSV files in ``data/`` are the source of truth. Running
+
+    python -m novamart.store
+
+converts them once into a typed columnar store (Parquet, in the dtypes
+declared in ``novamart.schema``) under ``data/.store``. ``load_table``
+reads from that store whenever a file is present and newer than its CSV,
+and falls back to parsing the CSV otherwise.
+"""
+import os
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+from novamart import schema
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.environ.get('NOVAMART_DATA_DIR', os.path.join(BASE_DIR, 'data'))
+STORE_DIR = os.path.join(DATA_DIR, '.store')
+
+# Dataset name -> CSV file in DATA_DIR
+DATASETS = {
+    'campaign': 'campaign_performance.csv',
+    'customer': 'customer_data.csv',
+    'product': 'product_sales.csv',
+    'lead_scoring': 'lead_scoring_results.csv',
+    'feature_importance': 'feature_importance.csv',
+    'learning_curve': 'learning_curve.csv',
+    'geographic': 'geographic_data.csv',
+    'attribution': 'channel_attribution.csv',
+    'funnel': 'funnel_data.csv',
+    'journey': 'customer_journey.csv',
+    'correlation': 'correlation_matrix.csv',
+    'events': 'touchpoint_events.csv',
+    'web_events': 'web_events.csv',
+}
+
+# Datasets whose file may be absent; everything else is required. With a raw
+# touchpoint event log present, the attribution table is computed from it
+# (see novamart.attribution) instead of read from channel_attribution.csv;
+# likewise the funnel table from a web/app event log (see novamart.funnel).
+OPTIONAL = {'events', 'web_events'}
+
+# Tables not kept among the snapshot's in-memory tables. Lead scores and web
+# events are only ever streamed in chunks (see iter_chunks). The touchpoint
+# event log is read whole, but only while attribution and the journey path
+# index are recomputed from it, and is dropped afterwards.
+STREAMED = {'lead_scoring', 'events', 'web_events'}
+
+# Rows per chunk when streaming a table
+CHUNK_ROWS = 1_000_000
+
+# Columns the dashboard reads from the large tables (derived ones are computed
+# from their inputs on load); the others are loaded whole
+PROJECTIONS = {
+    'campaign': ['date', 'campaign_type', 'channel', 'region', 'impressions', 'clicks',
+                 'conversions', 'spend', 'revenue'],
+    'customer': ['age', 'income', 'region', 'city_tier', 'customer_segment', 'acquisition_channel',
+                 'tenure_months', 'lifetime_value', 'total_purchases', 'last_purchase_days',
+                 'satisfaction_score', 'nps_category', 'is_churned'],
+    'product': ['product_name', 'category', 'subcategory', 'region', 'quarter', 'sales',
+                'profit_margin'],
+    'lead_scoring': ['actual_converted', 'predicted_probability', 'predicted_class'],
+    'events': ['customer_id', 'timestamp', 'channel', 'converted'],
+    'web_events': ['user_id', 'timestamp', 'event'],
+}
+
+
+def use_data_dir(path):
+    """Point every loader at another data directory (e.g. a synthetic scale-up)"""
+    global DATA_DIR, STORE_DIR
+    DATA_DIR = os.path.abspath(path)
+    STORE_DIR = os.path.join(DATA_DIR, '.store')
+
+
+def csv_path(name):
+    """Path of the source CSV for a dataset"""
+    return os.path.join(DATA_DIR, DATASETS[name])
+
+
+def available():
+    """Dataset names whose file is present (required ones are always listed)"""
+    return [name for name in DATASETS
+            if name not in OPTIONAL or os.path.exists(csv_path(name))]
+
+
+def store_path(name):
+    """Path of the columnar copy of a dataset"""
+    return os.path.join(STORE_DIR, f'{name}.parquet')
+
+
+def store_is_fresh(name):
+    """True when the columnar copy exists and is not older than its CSV"""
+    path = store_path(name)
+    if not os.path.exists(path):
+        return False
+    return os.path.getmtime(path) >= os.path.getmtime(csv_path(name))
+
+
+def read_csv(name, columns=None):
+    """Parse a dataset from its CSV into its declared schema"""
+    df = pd.read_csv(csv_path(name), usecols=schema.physical_columns(name, columns))
+    return schema.project(name, schema.apply(name, df), columns)
+
+
+def read_store(name, columns=None):
+    """Read a dataset from the columnar store, memory-mapped and projected"""
+    df = pd.read_parquet(store_path(name), columns=schema.physical_columns(name, columns),
+                         memory_map=True)
+    # apply() is a no-op for stores written with the current schema
+    return schema.project(name, schema.apply(name, df), columns)
+
+
+def load_table(name, columns=None):
+    """Load one dataset, preferring the columnar store over CSV"""
+    if store_is_fresh(name):
+        try:
+            return read_store(name, columns)
+        except ImportError:
+            # No Parquet engine installed
+            pass
+    return read_csv(name, columns)
+
+
+def iter_chunks(name, columns=None, chunk_rows=CHUNK_ROWS):
+    """Yield a dataset as DataFrames of at most ``chunk_rows`` rows"""
+    physical = schema.physical_columns(name, columns)
+    if store_is_fresh(name):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            pq = None
+        if pq is not None:
+            parquet = pq.ParquetFile(store_path(name), memory_map=True)
+            for batch in parquet.iter_batches(batch_size=chunk_rows, columns=physical):
+                yield schema.project(name, schema.apply(name, batch.to_pandas()), columns)
+            return
+    for chunk in pd.read_csv(csv_path(name), usecols=physical, chunksize=chunk_rows):
+        yield schema.project(name, schema.apply(name, chunk), columns)
+
+
+def _freeze(values):
+    """Mark the NumPy buffer behind a column read-only"""
+    array = values.codes if isinstance(values, pd.Categorical) else np.asarray(values)
+    # Views are flagged through the array that owns the memory
+    while isinstance(array.base, np.ndarray):
+        array = array.base
+    array.flags.writeable = False
+
+
+class SharedTables(Mapping):
+    """Read-only mapping of tables shared across sessions
+
+    Every lookup returns a new shallow frame over the shared, read-only
+    buffers. Assigning a column or writing through ``.loc`` therefore
+    changes only that frame: with copy-on-write the write copies the column
+    it touches, and without it the write fails on the read-only buffer.
+    """
+
+    def __init__(self, tables):
+        self._tables = dict(tables)
+        for df in self._tables.values():
+            for name in df.columns:
+                _freeze(df[name].array)
+
+    def __getitem__(self, name):
+        return self._tables[name].copy(deep=False)
+
+    def __iter__(self):
+        return iter(self._tables)
+
+    def __len__(self):
+        return len(self._tables)
+
+
+def share_tables(tables):
+    """Read-only view of loaded tables for sharing across sessions without copies"""
+    return SharedTables(tables)
+
+
+def convert_to_store(names=None):
+    """Write the typed columnar copy of each dataset; returns the paths written"""
+    os.makedirs(STORE_DIR, exist_ok=True)
+    written = []
+    for name in names or available():
+        df = read_csv(name)
+        df.to_parquet(store_path(name), index=False)
+        written.append(store_path(name))
+    return written
+
+
+if __name__ == '__main__':
+    for path in convert_to_store():
+        print(f"wrote {os.path.relpath(path, BASE_DIR)} ({os.path.getsize(path)/1024:.1f} KB)")
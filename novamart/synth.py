@@ -0,0 +1,112 @@
+"""Synthetic, schema-faithful scale-ups of the sample data.
+
+    python -m novamart.synth --scale 100 --out data_100x
+
+writes every file in ``data/`` to ``--out``. The four row-level tables
+(campaign, customer, product, lead scoring) become ``scale`` copies of the
+sample: copy 0 is the sample itself, and every further copy gets its own ids
+(and campaign / product names) with jittered measures. Derived columns are
+recomputed, so the rows stay internally consistent. Summary tables
+(attribution, funnel, journey, ...) are copied unchanged. Copies are
+generated and appended one at a time, so memory stays flat at any scale.
+Point the dashboard at the result with ``NOVAMART_DATA_DIR``.
+"""
+import argparse
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from novamart import schema, store
+
+
+def _jitter(rng, n, sigma):
+    return rng.lognormal(0.0, sigma, n)
+
+
+def _derive(name, df):
+    """Recompute the derived columns as the source files store them (2 dp)"""
+    for col, ratio in schema.DERIVED.get(name, {}).items():
+        if col in df.columns:
+            df[col] = ratio(df).astype(float).round(2)
+    return df
+
+
+def _campaign(df, copy, rng):
+    df['campaign_id'] = df['campaign_id'] + f'_{copy}'
+    df['campaign_name'] = df['campaign_name'] + f' #{copy + 1}'
+    # Scale impressions, clicks and conversions together so the funnel stays ordered
+    f = _jitter(rng, len(df), 0.15)
+    for col in ('impressions', 'clicks', 'conversions'):
+        df[col] = np.rint(df[col] * f).astype(np.int64)
+    df['spend'] = (df['spend'] * f * _jitter(rng, len(df), 0.05)).round(2)
+    df['revenue'] = (df['revenue'] * f * _jitter(rng, len(df), 0.1)).round(2)
+    return df
+
+
+def _customer(df, copy, rng):
+    df['customer_id'] = df['customer_id'] + f'_{copy}'
+    df['income'] = np.rint(df['income'] * _jitter(rng, len(df), 0.05)).astype(np.int64)
+    df['lifetime_value'] = np.rint(df['lifetime_value'] * _jitter(rng, len(df), 0.1)).astype(np.int64)
+    return df
+
+
+def _product(df, copy, rng):
+    df['product_id'] = df['product_id'] + f'_{copy}'
+    df['product_name'] = df['product_name'] + f' {copy + 1}'
+    f = _jitter(rng, len(df), 0.15)
+    df['units_sold'] = np.maximum(1, np.rint(df['units_sold'] * f)).astype(np.int64)
+    df['sales'] = (df['sales'] * f).round(2)
+    df['profit'] = (df['profit'] * f * _jitter(rng, len(df), 0.1)).round(2)
+    return df
+
+
+def _lead_scoring(df, copy, rng):
+    df['lead_id'] = df['lead_id'] + f'_{copy}'
+    probability = np.clip(df['predicted_probability'] + rng.normal(0.0, 0.02, len(df)), 0, 1)
+    df['predicted_probability'] = probability.round(4)
+    df['predicted_class'] = (df['predicted_probability'] >= 0.5).astype(np.int64)
+    return df
+
+
+# Dataset -> how to make copy k (k >= 1) of the sample rows
+SCALED = {
+    'campaign': _campaign,
+    'customer': _customer,
+    'product': _product,
+    'lead_scoring': _lead_scoring,
+}
+
+
+def generate(out_dir, scale, seed=0, source_dir=None):
+    """Write every dataset at ``scale`` times the sample size; returns {dataset: rows}"""
+    source_dir = source_dir or store.DATA_DIR
+    os.makedirs(out_dir, exist_ok=True)
+    rows = {}
+    for name, filename in store.DATASETS.items():
+        source, target = os.path.join(source_dir, filename), os.path.join(out_dir, filename)
+        if name in store.OPTIONAL and not os.path.exists(source):
+            continue
+        if name not in SCALED:
+            shutil.copyfile(source, target)
+            rows[name] = len(pd.read_csv(source))
+            continue
+        sample = pd.read_csv(source)
+        sample.to_csv(target, index=False)
+        for copy in range(1, scale):
+            rng = np.random.default_rng([seed, copy])
+            df = _derive(name, SCALED[name](sample.copy(), copy, rng))
+            df.to_csv(target, mode='a', header=False, index=False)
+        rows[name] = len(sample) * scale
+    return rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--scale', type=int, default=10, help="multiplier of the sample row counts")
+    parser.add_argument('--out', required=True, help="directory to write the CSV files to")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    for name, n in generate(args.out, args.scale, args.seed).items():
+        print(f"{name:<20} {n:>12,} rows")
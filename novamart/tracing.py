@@ -0,0 +1,151 @@
+"""Opt-in spans for timing one script run: sections, charts and the aggregations under them.
+
+Code marks a hot path with
+
+    with tracing.span('rollup', 'compute', rows_in=len(cube)) as s:
+        out = ...
+        s.set(rows_out=len(out))
+
+or wraps a whole function with ``@tracing.traced('rollup')``, which records
+the row counts of its first frame argument and of its result.
+
+Spans are recorded only while a ``Tracer`` is active for the current run
+(``activate``); otherwise ``span`` returns a shared no-op object, so
+instrumented code costs one context-variable lookup per call. The
+recorded spans export as a Chrome trace (``chrome://tracing``, Perfetto) or
+as JSON lines. ``NOVAMART_TRACE=1`` turns the sidebar's debug panel on by
+default.
+"""
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+
+ENABLED = os.environ.get('NOVAMART_TRACE', '').lower() in ('1', 'true', 'yes')
+
+_CURRENT = contextvars.ContextVar('novamart_tracer', default=None)
+
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'cat', 'args', 'depth', 'began')
+
+    def __init__(self, tracer, name, cat, args):
+        self.tracer, self.name, self.cat, self.args = tracer, name, cat, args
+
+    def __enter__(self):
+        self.depth = self.tracer._depth
+        self.tracer._depth += 1
+        self.began = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        ended = time.perf_counter()
+        self.tracer._depth -= 1
+        self.tracer._record(self, ended)
+        return False
+
+    def set(self, **args):
+        """Attach measurements known only once the work is done (e.g. rows out)"""
+        self.args.update(args)
+
+
+class Tracer:
+    """Spans recorded during one script run"""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.events = []
+        self._depth = 0
+        self._tid = threading.get_ident()
+
+    def span(self, name, cat='compute', **args):
+        return _Span(self, name, cat, args)
+
+    def _record(self, span, ended):
+        self.events.append({
+            'name': span.name,
+            'cat': span.cat,
+            'start_ms': (span.began - self.origin) * 1e3,
+            'ms': (ended - span.began) * 1e3,
+            'depth': span.depth,
+            **span.args,
+        })
+
+    def rows(self):
+        """Events in start order, for display"""
+        return sorted(self.events, key=lambda e: (e['start_ms'], e['depth']))
+
+    def chrome_trace(self):
+        """Trace Event Format document (complete events, microseconds)"""
+        return json.dumps({'traceEvents': [{
+            'name': e['name'], 'cat': e['cat'], 'ph': 'X', 'pid': 1, 'tid': self._tid,
+            'ts': round(e['start_ms'] * 1e3, 1), 'dur': round(e['ms'] * 1e3, 1),
+            'args': {k: v for k, v in e.items() if k not in ('name', 'cat', 'start_ms', 'ms', 'depth')},
+        } for e in self.rows()]}, default=str)
+
+    def jsonl(self):
+        """One JSON object per span"""
+        return ''.join(json.dumps(e, default=str) + '\n' for e in self.rows())
+
+
+def activate(tracer):
+    """Make ``tracer`` (or None) the one spans record into for this run; returns a reset token"""
+    return _CURRENT.set(tracer)
+
+
+def deactivate(token):
+    _CURRENT.reset(token)
+
+
+def span(name, cat='compute', **args):
+    """A span on the active tracer, or a no-op when there is none"""
+    tracer = _CURRENT.get()
+    if tracer is None:
+        return _NO_SPAN
+    return tracer.span(name, cat, **args)
+
+
+def _rows(values):
+    """Row count of the first frame/array among ``values``"""
+    for value in values:
+        shape = getattr(value, 'shape', None)
+        if shape:
+            return shape[0]
+    return None
+
+
+def traced(name, cat='compute'):
+    """Decorator: record each call as a span with rows in (first frame argument) and out"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            tracer = _CURRENT.get()
+            if tracer is None:
+                return fn(*args, **kwargs)
+            with tracer.span(name, cat, rows_in=_rows(args)) as span:
+                out = fn(*args, **kwargs)
+                span.set(rows_out=_rows((out,)))
+            return out
+        return wrapper
+    return decorate
+
+
+def active():
+    """True while a tracer is recording (to skip measurement-only work otherwise)"""
+    return _CURRENT.get() is not None
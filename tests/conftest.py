@@ -0,0 +1,15 @@
+import shutil
+
+import pytest
+
+from novamart import store
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """A scratch copy of the sample data files, with every loader pointed at it"""
+    for name in store.available():
+        shutil.copy(store.csv_path(name), tmp_path)
+    monkeypatch.setattr(store, 'DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(store, 'STORE_DIR', str(tmp_path / '.store'))
+    return tmp_path
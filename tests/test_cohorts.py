@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from novamart import cohorts, store
+
+MONTHS = 24
+
+
+@pytest.fixture(scope='module')
+def customers():
+    return store.read_csv('customer')
+
+
+def _per_cohort_loop(customers, by, months):
+    """Retention and LTV one (cohort, month) cell at a time"""
+    codes, labels = cohorts.cohort_codes(customers, by)
+    observed, active = cohorts.lifetimes(customers)
+    accrual = np.maximum(active, 1)
+    rate = customers['lifetime_value'].to_numpy(dtype=np.float64) / accrual
+    retention = np.full((len(labels), months), np.nan)
+    ltv = np.full((len(labels), months), np.nan)
+    for c in range(len(labels)):
+        for m in range(1, months + 1):
+            seen = (codes == c) & (observed >= m)
+            if seen.any():
+                retention[c, m - 1] = (active[seen] >= m).mean() * 100
+                ltv[c, m - 1] = (rate[seen] * np.minimum(m, accrual[seen])).mean()
+    return retention, ltv
+
+
+@pytest.mark.parametrize('by', list(cohorts.COHORTS))
+def test_matrices_match_per_cohort_loop(customers, by):
+    # A short month axis also exercises lifetimes running past its edge
+    matrix = cohorts.build(customers, by, max_months=MONTHS)
+    retention, ltv = _per_cohort_loop(customers, by, MONTHS)
+    np.testing.assert_allclose(matrix.retention, retention, rtol=1e-9)
+    np.testing.assert_allclose(matrix.ltv, ltv, rtol=1e-9)
+
+
+@pytest.mark.parametrize('months', [1, 6, 12, 24])
+def test_cohorts_add_up_to_overall_retention(customers, months):
+    matrix = cohorts.build(customers, 'customer_segment', max_months=MONTHS)
+    observed = matrix.customers[:, months - 1]
+    active = np.nan_to_num(matrix.retention[:, months - 1]) / 100 * observed
+    assert active.sum() / observed.sum() * 100 == pytest.approx(cohorts.retention_at(customers, months))
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from novamart import funnel
+
+
+@pytest.fixture(scope='module')
+def events():
+    return funnel.synthetic_events(200_000, seed=1)
+
+
+def _level(session, window):
+    """Stages a session's (seconds, stage) events complete, in order"""
+    first = previous = None
+    for k in range(len(funnel.STAGES)):
+        reached = next((t for t, s in session
+                        if s == k and (k == 0 or previous <= t <= first + window)), None)
+        if reached is None:
+            return k
+        first = reached if k == 0 else first
+        previous = reached
+    return len(funnel.STAGES)
+
+
+def _brute_force(events, inactivity=funnel.DEFAULT_INACTIVITY, window=funnel.DEFAULT_WINDOW):
+    """Sessions reaching each stage, one user and one session at a time"""
+    by_level = np.zeros(len(funnel.STAGES) + 1, dtype=np.int64)
+    frame = pd.DataFrame({
+        'user': events['user_id'].to_numpy(),
+        'seconds': events['timestamp'].to_numpy(dtype='datetime64[s]').astype(np.int64),
+        'stage': pd.Index(funnel.STAGES).get_indexer(events['event'].astype(str)),
+    })
+    for _, rows in frame.groupby('user', sort=False):
+        rows = rows.sort_values('seconds', kind='stable')
+        session, last = [], None
+        for t, s in zip(rows['seconds'].tolist(), rows['stage'].tolist()):
+            if last is not None and t - last > inactivity:
+                by_level[_level(session, window)] += 1
+                session = []
+            session.append((t, s))
+            last = t
+        by_level[_level(session, window)] += 1
+    return np.cumsum(by_level[::-1])[::-1][1:], int(by_level.sum())
+
+
+def test_whole_log_matches_per_session_loop(events):
+    visitors, sessions = _brute_force(events)
+    table = funnel.compute(events)
+    assert table['visitors'].tolist() == visitors.tolist()
+    assert table.attrs['sessions'] == sessions
+
+
+@pytest.mark.parametrize('chunk_rows', [997, 10_000, 77_777])
+def test_streaming_matches_whole_log(events, chunk_rows):
+    whole = funnel.compute(events)
+    chunks = (events.iloc[start:start + chunk_rows] for start in range(0, len(events), chunk_rows))
+    streamed = funnel.FunnelCounter.from_chunks(chunks).table()
+    pd.testing.assert_frame_equal(streamed, whole)
+    assert streamed.attrs['sessions'] == whole.attrs['sessions']
+
+
+def test_out_of_order_chunk_is_rejected(events):
+    counter = funnel.FunnelCounter().add(events.iloc[100_000:])
+    with pytest.raises(ValueError):
+        counter.add(events.iloc[:1000])
@@ -0,0 +1,75 @@
+import pytest
+
+from novamart import ingest, store
+
+
+def _hold_back(path, rows):
+    """Drop the last ``rows`` lines of a file; returns them"""
+    with open(path, 'rb') as f:
+        lines = f.readlines()
+    with open(path, 'wb') as f:
+        f.writelines(lines[:-rows])
+    return lines[-rows:]
+
+
+def _append(path, data):
+    with open(path, 'ab') as f:
+        f.write(data)
+
+
+def test_append_is_folded_in(data_dir):
+    path = store.csv_path('campaign')
+    held = _hold_back(path, 30)
+    ingestor = ingest.Ingestor('pandas')
+    ingestor.refresh()
+
+    _append(path, b''.join(held))
+    snapshot = ingestor.refresh()
+
+    expected = store.read_csv('campaign')
+    assert snapshot.changes == {'campaign': 'appended: 30 rows'}
+    assert len(snapshot.tables['campaign']) == len(expected)
+    assert snapshot.engine.totals()['revenue'] == pytest.approx(expected['revenue'].sum())
+
+
+def test_failed_refresh_does_not_lose_appended_rows(data_dir):
+    campaign, customer = store.csv_path('campaign'), store.csv_path('customer')
+    held = _hold_back(campaign, 30)
+    with open(customer, 'rb') as f:
+        customer_bytes = f.read()
+    ingestor = ingest.Ingestor('pandas')
+    ingestor.refresh()
+
+    # The campaign append is read before the corrupt customer file fails the refresh
+    _append(campaign, b''.join(held))
+    with open(customer, 'wb') as f:
+        f.write(b'not,the,customer,columns\n1,2,3,4\n')
+    with pytest.raises(ValueError):
+        ingestor.refresh()
+
+    with open(customer, 'wb') as f:
+        f.write(customer_bytes)
+    snapshot = ingestor.refresh()
+
+    expected = store.read_csv('campaign')
+    assert len(snapshot.tables['campaign']) == len(expected)
+    assert snapshot.campaign_cube['date'].max() == expected['date'].max()
+
+
+def test_partial_row_waits_for_its_newline(data_dir):
+    path = store.csv_path('campaign')
+    last, = _hold_back(path, 1)
+    ingestor = ingest.Ingestor('pandas')
+    before = ingestor.refresh()
+
+    # The writer has not finished the row: the revenue field is cut short
+    cut = last.rfind(b',') + 3
+    _append(path, last[:cut])
+    assert ingestor.refresh() is before
+
+    _append(path, last[cut:])
+    snapshot = ingestor.refresh()
+    expected = store.read_csv('campaign')
+    assert snapshot.changes == {'campaign': 'appended: 1 rows'}
+    assert len(snapshot.tables['campaign']) == len(expected)
+    assert snapshot.engine.totals()['revenue'] == pytest.approx(expected['revenue'].sum())